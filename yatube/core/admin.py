@@ -1,5 +1,144 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db.models import ForeignKey, Model, QuerySet
+from django.db.models.functions import Substr
+from django.forms import Field
+from django.http import HttpRequest
+
+from core.utils import CountingPaginator
+
+
+class KnownAutocompleteSelect(AutocompleteSelect):
+    known: Dict[str, Model] = {}
+
+    def optgroups(
+        self,
+        name: str,
+        value: List[str],
+        attr: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Optional[str], List[Dict[str, Any]], int]]:
+        selected = {
+            str(item)
+            for item in value
+            if str(item) not in self.choices.field.empty_values
+        }
+        if not selected <= self.known.keys():
+            return super().optgroups(name, value, attr)
+        default = (None, [], 0)
+        if not self.is_required:
+            default[1].append(self.create_option(name, '', '', False, 0))
+        for pk in selected:
+            default[1].append(
+                self.create_option(
+                    name,
+                    self.known[pk].pk,
+                    self.choices.field.label_from_instance(self.known[pk]),
+                    selected,
+                    len(default[1]),
+                ),
+            )
+        return [default]
 
 
 class BaseAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
+    excerpt_fields: Sequence[str] = ()
+    count_tags: Sequence[str] = ()
+    show_full_result_count = False
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                **{
+                    f'{name}_excerpt': Substr(
+                        name,
+                        1,
+                        settings.ADMIN_EXCERPT_LENGTH,
+                    )
+                    for name in self.excerpt_fields
+                },
+            )
+        )
+
+    def get_list_display(self, request: HttpRequest) -> Sequence[str]:
+        return [
+            self.excerpt(name) if name in self.excerpt_fields else name
+            for name in super().get_list_display(request)
+        ]
+
+    def formfield_for_foreignkey(
+        self,
+        db_field: ForeignKey,
+        request: HttpRequest,
+        **kwargs,
+    ) -> Field:
+        if 'widget' not in kwargs and (
+            db_field.name in self.get_autocomplete_fields(request)
+        ):
+            kwargs['widget'] = KnownAutocompleteSelect(
+                db_field.remote_field,
+                self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request: HttpRequest, **kwargs) -> type:
+        formset = super().get_changelist_formset(request, **kwargs)
+
+        class ChangeListForm(formset.form):
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+                for name, field in self.fields.items():
+                    widget = getattr(field.widget, 'widget', field.widget)
+                    if not isinstance(widget, KnownAutocompleteSelect):
+                        continue
+                    related = getattr(self.instance, name)
+                    if related is not None:
+                        widget.known = {str(related.pk): related}
+
+        formset.form = ChangeListForm
+        return formset
+
+    def get_changelist(self, request: HttpRequest, **kwargs) -> type:
+        excerpt_fields = self.excerpt_fields
+
+        class ExcerptChangeList(ChangeList):
+            def get_queryset(self, request: HttpRequest) -> QuerySet:
+                return super().get_queryset(request).defer(*excerpt_fields)
+
+        return ExcerptChangeList
+
+    def get_paginator(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+        per_page: int,
+        orphans: int = 0,
+        allow_empty_first_page: bool = True,
+    ) -> Paginator:
+        return CountingPaginator(
+            queryset,
+            per_page,
+            self.count_tags,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+    def excerpt(self, name: str) -> Callable[[Model], str]:
+        def display(obj: Model) -> str:
+            value = getattr(obj, f'{name}_excerpt')
+            if len(value) < settings.ADMIN_EXCERPT_LENGTH:
+                return value
+            return value + '…'
+
+        field = self.model._meta.get_field(name)
+        display.short_description = field.verbose_name
+        display.admin_order_field = name
+        return display
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = 'core'
     verbose_name = 'служебное приложение'
+
+    def ready(self) -> None:
+        from core import db  # noqa: F401
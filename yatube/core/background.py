@@ -0,0 +1,28 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import connection, connections
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_WORKERS,
+    thread_name_prefix='background',
+)
+
+
+def _run(func: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(
+    func: Callable[..., Any],
+    *args: Any,
+) -> Optional[Future]:
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        # Потоки не могут надёжно делить in-memory SQLite с запросом.
+        func(*args)
+        return None
+    return executor.submit(_run, func, *args)
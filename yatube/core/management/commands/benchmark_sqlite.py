@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas
+
+SEED_ROWS = 10_000
+
+
+def seed(path: str, pragmas: Dict[str, Any]) -> None:
+    connection = sqlite3.connect(path, isolation_level=None)
+    apply_pragmas(connection, pragmas)
+    connection.execute(
+        'CREATE TABLE post '
+        '(id INTEGER PRIMARY KEY, author INTEGER, text TEXT)',
+    )
+    connection.execute('CREATE INDEX post_author ON post (author, id)')
+    connection.executemany(
+        'INSERT INTO post (author, text) VALUES (?, ?)',
+        ((number % 100, 'текст ' * 20) for number in range(SEED_ROWS)),
+    )
+    connection.close()
+
+
+def run(
+    path: str,
+    pragmas: Dict[str, Any],
+    timeout: float,
+    readers: int,
+    writers: int,
+    seconds: float,
+) -> Dict[str, int]:
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(write: bool, number: int) -> None:
+        connection = sqlite3.connect(
+            path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        apply_pragmas(connection, pragmas)
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                if write:
+                    connection.execute('BEGIN')
+                    connection.execute(
+                        'INSERT INTO post (author, text) VALUES (?, ?)',
+                        (number, 'комментарий'),
+                    )
+                    connection.execute('COMMIT')
+                else:
+                    connection.execute(
+                        'SELECT id, text FROM post WHERE author = ? '
+                        'ORDER BY id DESC LIMIT 10',
+                        (done % 100,),
+                    ).fetchall()
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+        connection.close()
+        with lock:
+            totals['writes' if write else 'reads'] += done
+            totals['errors'] += errors
+
+    threads = [
+        threading.Thread(target=worker, args=(index < writers, index))
+        for index in range(readers + writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает конкурентную нагрузку на SQLite с PRAGMA и без.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        configs = (
+            ('по умолчанию', {}, 5),
+            (
+                'настроенная',
+                settings.SQLITE_PRAGMAS,
+                settings.DATABASES['default']['OPTIONS']['timeout'],
+            ),
+        )
+        for title, pragmas, timeout in configs:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                seed(path, pragmas)
+                totals = run(
+                    path,
+                    pragmas,
+                    timeout,
+                    options['readers'],
+                    options['writers'],
+                    options['seconds'],
+                )
+            self.stdout.write(
+                f'{title}: '
+                f'чтений/с {totals["reads"] / options["seconds"]:.0f}, '
+                f'записей/с {totals["writes"] / options["seconds"]:.0f}, '
+                f'ошибок блокировки {totals["errors"]}',
+            )
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик '
+        '(локальная замена репликации).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases',
+            nargs='*',
+            help='Псевдонимы реплик, по умолчанию DATABASE_REPLICAS.',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Не настроено ни одной реплики.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        primary.ensure_connection()
+        for alias in aliases:
+            replica = connections[alias]
+            replica.close()
+            # Копия содержит всё, что записано до начала резервирования.
+            position = time.time_ns()
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            cache.set(f'replica-position:{alias}', position, None)
+            self.stdout.write(f'{alias}: {replica.settings_dict["NAME"]}')
+        self.stdout.write(self.style.SUCCESS('Готово. Реплики обновлены.'))
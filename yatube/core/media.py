@@ -0,0 +1,101 @@
+import mimetypes
+import os
+import re
+from http import HTTPStatus
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, HttpRequest, HttpResponse
+from django.utils.http import http_date, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def media_etag(stat: os.stat_result) -> str:
+    return quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        raise ValueError(f'Некорректный Range: {header!r}')
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(f'Некорректный Range: {header!r}')
+    if not first:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def read_range(file: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def accel_response(path: str, full_path: str) -> HttpResponse:
+    content_type, _ = mimetypes.guess_type(full_path)
+    response = HttpResponse(
+        content_type=content_type or 'application/octet-stream',
+    )
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + path
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def file_response(
+    request: HttpRequest,
+    full_path: str,
+    stat: os.stat_result,
+) -> HttpResponse:
+    content_type, _ = mimetypes.guess_type(full_path)
+    byte_range = (0, stat.st_size - 1)
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and if_range in (None, media_etag(stat)):
+        try:
+            byte_range = parse_range(header, stat.st_size)
+        except ValueError:
+            pass
+    if byte_range is None:
+        response = HttpResponse(
+            status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    start, end = byte_range
+    if end - start + 1 == stat.st_size:
+        response = FileResponse(open(full_path, 'rb'))
+    else:
+        response = FileResponse(
+            read_range(open(full_path, 'rb'), start, end),
+            status=HTTPStatus.PARTIAL_CONTENT,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def cache_headers(response: HttpResponse, stat: os.stat_result) -> None:
+    response['ETag'] = media_etag(stat)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (
+        f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    )
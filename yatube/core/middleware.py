@@ -0,0 +1,99 @@
+import hashlib
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+
+from core.routers import read_from_replica
+from core.utils import (
+    SURROGATE_KEY_HEADER,
+    get_generations,
+    replica_lagging,
+)
+
+PRIMARY_PIN_COOKIE = 'primary'
+
+
+class AnonymousPageCacheMiddleware:
+    def __init__(
+        self,
+        get_response: Callable[[HttpRequest], HttpResponse],
+    ) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return self.get_response(request)
+        key = 'page:{}'.format(
+            hashlib.md5(request.get_full_path().encode()).hexdigest(),
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            tags, generations, response = cached
+            if get_generations(tags) == generations:
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    response=response,
+                )
+        response = self.get_response(request)
+        if (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and response.has_header(SURROGATE_KEY_HEADER)
+        ):
+            tags = response[SURROGATE_KEY_HEADER].split()
+            generations = get_generations(tags)
+            if not replica_lagging(tags):
+                cache.set(
+                    key,
+                    (tags, generations, response),
+                    settings.PAGE_CACHE_TIMEOUT,
+                )
+        return response
+
+
+class ReplicaReadMiddleware:
+    def __init__(
+        self,
+        get_response: Callable[[HttpRequest], HttpResponse],
+    ) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, 'replica_token', None)
+            if token is not None:
+                read_from_replica.reset(token)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(
+        self,
+        request: HttpRequest,
+        view_func: Callable,
+        view_args: tuple,
+        view_kwargs: dict,
+    ) -> None:
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.app_name in settings.REPLICA_APPS
+            and PRIMARY_PIN_COOKIE not in request.COOKIES
+        ):
+            request.replica_token = read_from_replica.set(True)
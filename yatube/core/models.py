@@ -18,7 +18,7 @@ class TimestampedModel(DefaultModel, Timestamped):
     )
 
     class Meta:
-        ordering = ('-modified',)
+        ordering = ('-created', '-pk')
         abstract = True
 
 
@@ -35,4 +35,4 @@ class TextAuthor(TimestampedModel):
 
     class Meta:
         abstract = True
-        ordering = ('-created',)
+        ordering = ('-created', '-pk')
@@ -0,0 +1,34 @@
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+read_from_replica: ContextVar[bool] = ContextVar(
+    'read_from_replica',
+    default=False,
+)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: type, **hints) -> str:
+        if not read_from_replica.get() or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model: type, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        return True
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        model_name: Optional[str] = None,
+        **hints,
+    ) -> bool:
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+image_replaced = Signal(providing_args=['old_name', 'new_name'])
+variants_generated = Signal(providing_args=['image_name'])
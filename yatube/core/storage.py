@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+
+
+def content_name(name: str, digest: str) -> str:
+    directory, basename = os.path.split(name)
+    shards = [
+        digest[index * SHARD_WIDTH:(index + 1) * SHARD_WIDTH]
+        for index in range(SHARD_DEPTH)
+    ]
+    extension = os.path.splitext(basename)[1].lower()
+    return os.path.join(directory, *shards, f'{digest}{extension}')
+
+
+def unsharded_name(name: str) -> str:
+    *directory, basename = name.split('/')
+    shards = directory[-SHARD_DEPTH:]
+    digest = os.path.splitext(basename)[0]
+    if len(shards) < SHARD_DEPTH or ''.join(shards) != digest[
+        :SHARD_DEPTH * SHARD_WIDTH
+    ]:
+        return name
+    return '/'.join([*directory[:-SHARD_DEPTH], basename])
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name: str, content: File) -> str:
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        name = content_name(name, digest.hexdigest())
+        if self.exists(name):
+            # Отодвигает сборку мусора для файла, который снова понадобился.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
@@ -0,0 +1,13 @@
+from typing import List, Union
+
+from django import template
+from django.core.paginator import Page
+
+from core.utils import elided_page_range
+
+register = template.Library()
+
+
+@register.filter
+def page_window(page: Page) -> List[Union[int, str]]:
+    return list(elided_page_range(page.paginator, page.number))
@@ -0,0 +1,27 @@
+from django import template
+from django.core.paginator import Page
+from django.db.models import Model
+
+from core.thumbnails import ResponsiveImage, lookup_variant, prefetch_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def prefetch_page_variants(page: Page, *names: str) -> str:
+    page.object_list = list(page.object_list)
+    prefetch_variants(page.object_list, *names)
+    return ''
+
+
+@register.filter
+def variant(obj: Model, name: str) -> ResponsiveImage:
+    variants = getattr(obj, 'variants', None)
+    if variants is not None and name in variants:
+        return variants[name]
+    return lookup_variant(obj.image, name)
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(obj: Model, name: str, css: str = 'card-img my-2'):
+    return {'image': variant(obj, name), 'css': css}
@@ -0,0 +1,252 @@
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.fields.files import FieldFile
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+from sorl.thumbnail.parsers import parse_geometry
+
+from core.background import run_in_background
+from core.signals import image_replaced, variants_generated
+from core.uploads import normalize_image
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    'GIF': 'image/gif',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+}
+
+
+class Rendition(NamedTuple):
+    format: str
+    width: int
+    geometry: str
+    options: Dict[str, Any]
+
+
+class ResponsiveImage:
+    def __init__(
+        self,
+        image: FieldFile,
+        sizes: str,
+        renditions: Dict[str, List[ImageFile]],
+    ) -> None:
+        self.image = image
+        self.sizes = sizes
+        self.renditions = renditions
+
+    def __bool__(self) -> bool:
+        return bool(self.image)
+
+    @property
+    def fallback(self) -> List[ImageFile]:
+        return self.renditions.get(settings.THUMBNAIL_FORMATS[-1], [])
+
+    @property
+    def src(self) -> Union[ImageFile, FieldFile]:
+        return self.fallback[-1] if self.fallback else self.image
+
+    @property
+    def url(self) -> str:
+        return self.src.url
+
+    @property
+    def width(self) -> Optional[int]:
+        return self.fallback[-1].width if self.fallback else None
+
+    @property
+    def height(self) -> Optional[int]:
+        return self.fallback[-1].height if self.fallback else None
+
+    @property
+    def srcset(self) -> str:
+        return srcset(self.fallback)
+
+    @property
+    def sources(self) -> List[Dict[str, str]]:
+        return [
+            {'type': MIME_TYPES[image_format], 'srcset': srcset(files)}
+            for image_format in settings.THUMBNAIL_FORMATS[:-1]
+            for files in (self.renditions.get(image_format),)
+            if files
+        ]
+
+
+def srcset(files: Iterable[ImageFile]) -> str:
+    return ', '.join(f'{file.url} {file.width}w' for file in files)
+
+
+def renditions(name: str) -> List[Rendition]:
+    variant = settings.THUMBNAIL_VARIANTS[name]
+    width, height = parse_geometry(variant['geometry'])
+    return [
+        Rendition(
+            image_format,
+            rendition_width,
+            f'{rendition_width}x{round(height * rendition_width / width)}',
+            {**variant['options'], 'format': image_format},
+        )
+        for image_format in settings.THUMBNAIL_FORMATS
+        for rendition_width in settings.THUMBNAIL_WIDTHS
+        if rendition_width <= width
+    ]
+
+
+def sorl_options(source: ImageFile, options: Dict[str, Any]) -> Dict[str, Any]:
+    backend = default.backend
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def generate_variants(image_name: str, normalize: bool = False) -> None:
+    source_name = image_name
+    try:
+        if normalize:
+            source_name = normalize_image(image_name)
+        if source_name != image_name:
+            image_replaced.send(
+                sender=generate_variants,
+                old_name=image_name,
+                new_name=source_name,
+            )
+        for name in settings.THUMBNAIL_VARIANTS:
+            for rendition in renditions(name):
+                get_thumbnail(
+                    ImageFile(source_name, default_storage),
+                    rendition.geometry,
+                    **rendition.options,
+                )
+        # Страницы с исходной картинкой уже закешированы, их нужно обновить.
+        variants_generated.send(
+            sender=generate_variants,
+            image_name=source_name,
+        )
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', image_name)
+    finally:
+        cache.delete(f'thumbnail-pending:{image_name}')
+
+
+def schedule_variants(image_name: str, normalize: bool = False) -> None:
+    if cache.add(f'thumbnail-pending:{image_name}', True, 60 * 10):
+        transaction.on_commit(
+            lambda: run_in_background(
+                generate_variants,
+                image_name,
+                normalize,
+            ),
+        )
+
+
+def rendition_file(image: FieldFile, rendition: Rendition) -> ImageFile:
+    source = ImageFile(image)
+    return ImageFile(
+        default.backend._get_thumbnail_filename(
+            source,
+            rendition.geometry,
+            sorl_options(source, rendition.options),
+        ),
+        default.storage,
+    )
+
+
+def bulk_lookup(thumbnails: List[ImageFile]) -> List[Optional[ImageFile]]:
+    if not isinstance(default.kvstore, cached_db_kvstore.KVStore):
+        return [default.kvstore.get(thumbnail) for thumbnail in thumbnails]
+    keys = [add_prefix(thumbnail.key) for thumbnail in thumbnails]
+    kv_cache = default.kvstore.cache
+    values = kv_cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict(
+            KVStoreModel.objects.filter(key__in=missing).values_list(
+                'key',
+                'value',
+            ),
+        )
+        fetched = {
+            key: found.get(key, cached_db_kvstore.EMPTY_VALUE)
+            for key in missing
+        }
+        kv_cache.set_many(fetched, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(fetched)
+    return [
+        None
+        if values[key] == cached_db_kvstore.EMPTY_VALUE
+        else deserialize_image_file(values[key])
+        for key in keys
+    ]
+
+
+def lookup_images(
+    images: List[FieldFile],
+    names: Iterable[str],
+) -> List[Dict[str, ResponsiveImage]]:
+    names = list(names)
+    wanted = [
+        (index, name, rendition)
+        for index, image in enumerate(images)
+        for name in names
+        for rendition in renditions(name)
+        if image
+    ]
+    found = bulk_lookup(
+        [
+            rendition_file(images[index], rendition)
+            for index, _, rendition in wanted
+        ],
+    )
+    results = [
+        {
+            name: ResponsiveImage(
+                image,
+                settings.THUMBNAIL_VARIANTS[name]['sizes'],
+                {},
+            )
+            for name in names
+        }
+        for image in images
+    ]
+    for (index, name, rendition), thumbnail in zip(wanted, found):
+        if thumbnail is None:
+            schedule_variants(images[index].name)
+            continue
+        results[index][name].renditions.setdefault(
+            rendition.format,
+            [],
+        ).append(thumbnail)
+    return results
+
+
+def prefetch_variants(objects: Iterable[Model], *names: str) -> None:
+    objects = list(objects)
+    for obj, variants in zip(
+        objects,
+        lookup_images([obj.image for obj in objects], names),
+    ):
+        obj.variants = variants
+
+
+def lookup_variant(image: FieldFile, name: str) -> ResponsiveImage:
+    return lookup_images([image], (name,))[0][name]
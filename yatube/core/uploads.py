@@ -0,0 +1,76 @@
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, ImageOps
+
+from core.storage import unsharded_name
+
+EXIF_ORIENTATION = 0x0112
+TOO_BIG_MESSAGE = 'Загружаемый файл превышает IMAGE_UPLOAD_MAX_SIZE.'
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    def handle_raw_input(
+        self,
+        input_data: Any,
+        META: Dict[str, str],
+        content_length: int,
+        boundary: bytes,
+        encoding: Optional[str] = None,
+    ) -> None:
+        if content_length > settings.IMAGE_UPLOAD_MAX_SIZE + 64 * 1024:
+            raise RequestDataTooBig(TOO_BIG_MESSAGE)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise RequestDataTooBig(TOO_BIG_MESSAGE)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def validate_image_header(upload: UploadedFile) -> None:
+    image = upload.image
+    if image.format not in settings.IMAGE_FORMATS:
+        raise ValidationError(
+            'Поддерживаются только %(formats)s.',
+            code='invalid_format',
+            params={'formats': ', '.join(settings.IMAGE_FORMATS)},
+        )
+    width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Изображение больше %(limit)s пикселей.',
+            code='image_too_large',
+            params={'limit': settings.IMAGE_MAX_PIXELS},
+        )
+
+
+def normalize_image(image_name: str) -> str:
+    limit = settings.IMAGE_MAX_RESOLUTION
+    with default_storage.open(image_name) as file:
+        image = Image.open(file)
+        image_format = image.format
+        rotated = image.getexif().get(EXIF_ORIENTATION, 1) != 1
+        if not rotated and max(image.size) <= limit:
+            return image_name
+        if image_format == 'JPEG':
+            image.draft(image.mode, (limit, limit))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((limit, limit))
+    normalized = BytesIO()
+    image.save(
+        normalized,
+        image_format,
+        **settings.IMAGE_SAVE_OPTIONS.get(image_format, {}),
+    )
+    # Хранилище адресует файлы по содержимому, поэтому исходный файл не
+    # перезаписывается, а результат сохраняется под новым именем.
+    return default_storage.save(
+        unsharded_name(image_name),
+        ContentFile(normalized.getvalue()),
+    )
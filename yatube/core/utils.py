@@ -1,14 +1,326 @@
+import base64
+import collections.abc
+import hashlib
+import time
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import transaction
+from django.db.models import F, Model, Q, QuerySet
+from django.db.models.expressions import OrderBy
 from django.http import HttpRequest, HttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from core.routers import read_from_replica
+
+CURSOR_AFTER = 'after'
+CURSOR_BEFORE = 'before'
+PAGE_RANGE_ELLIPSIS = '…'
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+
+
+def encode_cursor(obj: Union[Model, Mapping[str, Any]]) -> str:
+    if isinstance(obj, Mapping):
+        created, pk = obj['created'], obj['pk']
+    else:
+        created, pk = obj.created, obj.pk
+    raw = f'{created.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4),
+        ).decode()
+        created, pk = raw.rsplit('|', 1)
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (ValueError, TypeError):
+        raise ValueError(f'Некорректный курсор: {token!r}')
+    if created is None:
+        raise ValueError(f'Некорректный курсор: {token!r}')
+    return created, pk
+
+
+class CursorPage(collections.abc.Sequence):
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list: List[Union[Model, Dict[str, Any]]],
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return f'<CursorPage of {len(self.object_list)}>'
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(
+        self,
+        index: Union[int, slice],
+    ) -> Union[Model, Dict[str, Any]]:
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0])
+
+
+def cursor_paginate(
+    queryset: QuerySet,
+    quantity: int = settings.PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> CursorPage:
+    # Явная сортировка запроса должна совпадать по значениям с (created, pk),
+    # например поля денормализованной копии, покрытые индексом.
+    keys = [
+        key.expression if isinstance(key, OrderBy) else F(key.lstrip('-'))
+        for key in queryset.query.order_by
+    ] or [F('created'), F('pk')]
+    try:
+        if before:
+            created, pk = decode_cursor(before)
+            rows = list(
+                queryset.filter(
+                    Q(created__gt=created) | Q(created=created, pk__gt=pk),
+                ).order_by(*(key.asc() for key in keys))[: quantity + 1],
+            )
+            return CursorPage(
+                rows[:quantity][::-1],
+                has_next=True,
+                has_previous=len(rows) > quantity,
+            )
+        if after:
+            created, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(created__lt=created) | Q(created=created, pk__lt=pk),
+            )
+    except ValueError:
+        after = None
+    rows = list(
+        queryset.order_by(*(key.desc() for key in keys))[: quantity + 1],
+    )
+    return CursorPage(
+        rows[:quantity],
+        has_next=len(rows) > quantity,
+        has_previous=bool(after),
+    )
+
+
+def get_generations(tags: Iterable[str]) -> List[int]:
+    keys = [f'generation:{tag}' for tag in tags]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(tags: Iterable[str]) -> None:
+    tags = list(tags)
+    for tag in tags:
+        key = f'generation:{tag}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+    if settings.DATABASE_REPLICAS:
+        # Отметка ставится после коммита, иначе синхронизация реплики между
+        # изменением и коммитом сочла бы её актуальной.
+        transaction.on_commit(
+            lambda: cache.set_many(
+                {f'bumped:{tag}': time.time_ns() for tag in tags},
+                None,
+            ),
+        )
+
+
+def replica_lagging(tags: Iterable[str]) -> bool:
+    if not read_from_replica.get() or not settings.DATABASE_REPLICAS:
+        return False
+    keys = [f'bumped:{tag}' for tag in tags]
+    bumped = cache.get_many(keys)
+    missing = [key for key in keys if key not in bumped]
+    if missing:
+        # Время изменения неизвестно: ждём следующей синхронизации.
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, None)
+        return True
+    positions = cache.get_many(
+        [f'replica-position:{alias}' for alias in settings.DATABASE_REPLICAS],
+    )
+    if len(positions) < len(settings.DATABASE_REPLICAS):
+        return True
+    return max(bumped.values(), default=0) > min(positions.values())
+
+
+def feed_cache(
+    request: HttpRequest,
+    tags: Sequence[str],
+) -> Dict[str, Union[int, str]]:
+    return {
+        # Отставшая реплика не должна попасть в кеш под новым поколением.
+        'timeout': 0 if replica_lagging(tags) else settings.FEED_CACHE_TIMEOUT,
+        'key': ':'.join(
+            (
+                *(
+                    request.GET.get(param, '')
+                    for param in ('page', CURSOR_AFTER, CURSOR_BEFORE)
+                ),
+                *(
+                    f'{tag}={generation}'
+                    for tag, generation in zip(tags, get_generations(tags))
+                ),
+            ),
+        ),
+    }
+
+
+def generation_etag(
+    request: HttpRequest,
+    tags: Optional[Sequence[str]],
+) -> Optional[str]:
+    if tags is None:
+        return None
+    if request.user.is_authenticated:
+        tags = (*tags, f'follow:{request.user.pk}')
+    if replica_lagging(tags):
+        return None
+    return hashlib.md5(
+        str(
+            (request.get_full_path(), request.user.pk, get_generations(tags)),
+        ).encode(),
+    ).hexdigest()
+
+
+def tag_response(response: HttpResponse, tags: Sequence[str]) -> HttpResponse:
+    response[SURROGATE_KEY_HEADER] = ' '.join(tags)
+    return response
+
+
+def exact_count(queryset: QuerySet, tags: Sequence[str]) -> int:
+    del tags
+    return queryset.count()
+
+
+def cached_count(queryset: QuerySet, tags: Sequence[str]) -> int:
+    limit = settings.PAGE_EXACT_COUNT_LIMIT
+    count = queryset.order_by()[: limit + 1].count()
+    if count <= limit:
+        return count
+    signature = hashlib.md5(
+        str((str(queryset.query), get_generations(tags))).encode(),
+    ).hexdigest()
+    key = f'count:{signature}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        if not replica_lagging(tags):
+            cache.set(key, count, settings.PAGE_COUNT_TIMEOUT)
+    return count
+
+
+class CountingPaginator(Paginator):
+    def __init__(
+        self,
+        object_list: QuerySet,
+        per_page: int,
+        count_tags: Sequence[str] = (),
+        **kwargs,
+    ) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_tags = count_tags
+
+    @cached_property
+    def count(self) -> int:
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list)
+        return import_string(settings.PAGE_COUNTER)(
+            self.object_list,
+            self.count_tags,
+        )
+
+
+def elided_page_range(
+    paginator: Paginator,
+    number: int,
+    on_each_side: int = 2,
+    on_ends: int = 1,
+) -> Iterator[Union[int, str]]:
+    num_pages = paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        yield from paginator.page_range
+        return
+    if number > on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield PAGE_RANGE_ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield PAGE_RANGE_ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
 
 
 def paginate(
     request: HttpRequest,
-    queryset: str,
+    queryset: QuerySet,
     quantity: int = settings.PAGE_SIZE,
-) -> HttpResponse:
-    return Paginator(queryset, quantity).get_page(request.GET.get('page'))
+    count_tags: Sequence[str] = (),
+) -> Union[Page, CursorPage]:
+    after = request.GET.get(CURSOR_AFTER)
+    before = request.GET.get(CURSOR_BEFORE)
+    if after or before:
+        return cursor_paginate(queryset, quantity, after, before)
+    return CountingPaginator(queryset, quantity, count_tags).get_page(
+        request.GET.get('page'),
+    )
 
 
 def truncatechars(chars: str, trim: int = settings.MAX_DEFAULT_LENGTH) -> str:
@@ -1,7 +1,16 @@
+import os
+import stat
 from http import HTTPStatus
 
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+
+from core.media import accel_response, cache_headers, file_response, media_etag
 
 
 def page_not_found(request: HttpRequest, exception: Exception) -> HttpResponse:
@@ -34,3 +43,26 @@ def permission_denied(
 ) -> HttpResponse:
     del exception
     return render(request, 'core/403.html', status=HTTPStatus.FORBIDDEN)
+
+
+@require_safe
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404(path)
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404(path)
+    response = get_conditional_response(
+        request,
+        etag=media_etag(file_stat),
+        last_modified=int(file_stat.st_mtime),
+    )
+    if response is None:
+        if settings.MEDIA_ACCEL:
+            response = accel_response(path, full_path)
+        else:
+            response = file_response(request, full_path, file_stat)
+    cache_headers(response, file_stat)
+    return response
@@ -1,7 +1,30 @@
+from typing import Tuple
+
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+from django.http import HttpRequest
 
 from core.admin import BaseAdmin
-from posts.models import Comment, Follow, Group, Post
+from posts.deletion import schedule_deletion
+from posts.models import Comment, Deletion, Follow, Group, Post
+from posts.search import match_expression
+
+
+def delete_in_background(
+    modeladmin: admin.ModelAdmin,
+    request: HttpRequest,
+    queryset: QuerySet,
+) -> None:
+    for obj in queryset:
+        schedule_deletion(obj)
+    modeladmin.message_user(
+        request,
+        f'Запланировано удалений: {len(queryset)}',
+    )
+
+
+delete_in_background.short_description = 'Удалить в фоне'
 
 
 @admin.register(Post)
@@ -15,7 +38,33 @@ class PostAdmin(BaseAdmin):
     )
     list_editable = ('group',)
     list_filter = ('created',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
+    autocomplete_fields = ('author', 'group')
+    date_hierarchy = 'created'
+    excerpt_fields = ('text',)
+    count_tags = ('posts',)
+    actions = (delete_in_background,)
+
+    def get_search_results(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+        search_term: str,
+    ) -> Tuple[QuerySet, bool]:
+        expression = match_expression(search_term)
+        if expression is None:
+            return queryset, False
+        return (
+            queryset.filter(
+                pk__in=RawSQL(
+                    'SELECT rowid FROM posts_post_fts '
+                    'WHERE posts_post_fts MATCH %s',
+                    (expression,),
+                ),
+            ),
+            False,
+        )
 
 
 @admin.register(Group)
@@ -25,6 +74,7 @@ class GroupAdmin(BaseAdmin):
         'title',
     )
     search_fields = ('title',)
+    actions = (delete_in_background,)
 
 
 @admin.register(Comment)
@@ -37,6 +87,11 @@ class CommentAdmin(BaseAdmin):
     )
     search_fields = ('text',)
     list_filter = ('created',)
+    list_select_related = ('author',)
+    autocomplete_fields = ('author', 'post')
+    date_hierarchy = 'created'
+    excerpt_fields = ('text',)
+    count_tags = ('comments',)
 
 
 @admin.register(Follow)
@@ -48,3 +103,15 @@ class FollowAdmin(BaseAdmin):
     )
     search_fields = ('user',)
     list_filter = ('author',)
+
+
+@admin.register(Deletion)
+class DeletionAdmin(BaseAdmin):
+    list_display = (
+        'pk',
+        'target',
+        'object_id',
+        'removed',
+        'created',
+    )
+    list_filter = ('target',)
@@ -0,0 +1,320 @@
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import QuerySet
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import condition, require_safe
+
+from core.thumbnails import ResponsiveImage, prefetch_variants
+from core.utils import (
+    CURSOR_AFTER,
+    CURSOR_BEFORE,
+    CursorPage,
+    cursor_paginate,
+    generation_etag,
+    tag_response,
+)
+from posts.models import Comment, Group, Post, visible_users
+from posts.timeline import timeline
+from posts.views import (
+    follow_etag,
+    group_etag,
+    index_etag,
+    post_etag,
+    profile_etag,
+)
+
+FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+CURSOR_COLUMNS = ('pk', 'created')
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'created': lambda value: value.isoformat(),
+    'image': lambda value: default_storage.url(value) if value else None,
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(error: ApiError) -> JsonResponse:
+    return JsonResponse({'detail': str(error)}, status=error.status)
+
+
+def requested_fields(
+    request: HttpRequest,
+    available: Dict[str, str],
+) -> List[str]:
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(available)
+    fields = [field for field in raw.split(',') if field]
+    unknown = set(fields) - available.keys()
+    if unknown:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(sorted(unknown))}',
+            HTTPStatus.BAD_REQUEST,
+        )
+    return fields
+
+
+def page_size(request: HttpRequest) -> int:
+    try:
+        size = int(request.GET.get('limit', settings.PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit должен быть числом', HTTPStatus.BAD_REQUEST)
+    return min(max(size, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def project(
+    queryset: QuerySet,
+    fields: Sequence[str],
+    available: Dict[str, str],
+) -> QuerySet:
+    return queryset.values(
+        *dict.fromkeys(
+            (*CURSOR_COLUMNS, *(available[field] for field in fields)),
+        ),
+    )
+
+
+def serialize(
+    row: Dict[str, Any],
+    fields: Sequence[str],
+    available: Dict[str, str],
+) -> Dict[str, Any]:
+    item = {}
+    for field in fields:
+        value = row[available[field]]
+        converter = CONVERTERS.get(field)
+        item[field] = value if converter is None else converter(value)
+    return item
+
+
+def page_data(
+    page: CursorPage,
+    fields: Sequence[str],
+    available: Dict[str, str],
+) -> Dict[str, Any]:
+    return {
+        'results': [serialize(row, fields, available) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def feed_response(
+    request: HttpRequest,
+    queryset: QuerySet,
+    tags: Sequence[str],
+) -> JsonResponse:
+    try:
+        fields = requested_fields(request, FIELDS)
+        quantity = page_size(request)
+    except ApiError as error:
+        return error_response(error)
+    page = cursor_paginate(
+        project(queryset, fields, FIELDS),
+        quantity,
+        after=request.GET.get(CURSOR_AFTER),
+        before=request.GET.get(CURSOR_BEFORE),
+    )
+    return tag_response(
+        JsonResponse(page_data(page, fields, FIELDS)),
+        tags,
+    )
+
+
+def not_found(message: str) -> JsonResponse:
+    return error_response(ApiError(message, HTTPStatus.NOT_FOUND))
+
+
+@require_safe
+@condition(etag_func=index_etag)
+def index(request: HttpRequest) -> JsonResponse:
+    return feed_response(
+        request,
+        Post.objects.visible(),
+        ('posts', 'groups'),
+    )
+
+
+@require_safe
+@condition(etag_func=group_etag)
+def group_posts(request: HttpRequest, slug: str) -> JsonResponse:
+    group = Group.objects.filter(slug=slug, pending_deletion=False).first()
+    if group is None:
+        return not_found('Группа не найдена')
+    return feed_response(
+        request,
+        group.posts.visible(),
+        (f'group:{group.pk}',),
+    )
+
+
+@require_safe
+@condition(etag_func=profile_etag)
+def profile(request: HttpRequest, username: str) -> JsonResponse:
+    author = visible_users().filter(username=username).first()
+    if author is None:
+        return not_found('Пользователь не найден')
+    return feed_response(
+        request,
+        author.posts.visible(),
+        (f'author:{author.pk}', 'groups'),
+    )
+
+
+def authenticated_follow_etag(request: HttpRequest) -> Optional[str]:
+    if not request.user.is_authenticated:
+        return None
+    return follow_etag(request)
+
+
+@require_safe
+@condition(etag_func=authenticated_follow_etag)
+def follow_index(request: HttpRequest) -> JsonResponse:
+    if not request.user.is_authenticated:
+        return error_response(
+            ApiError('Требуется авторизация', HTTPStatus.UNAUTHORIZED),
+        )
+    return feed_response(
+        request,
+        timeline(request.user),
+        (f'follow:{request.user.pk}',),
+    )
+
+
+@require_safe
+@condition(etag_func=post_etag)
+def post_detail(request: HttpRequest, id: int) -> JsonResponse:
+    try:
+        fields = requested_fields(request, FIELDS)
+    except ApiError as error:
+        return error_response(error)
+    row = project(Post.objects.visible().filter(pk=id), fields, FIELDS).first()
+    if row is None:
+        return not_found('Пост не найден')
+    comments = cursor_paginate(
+        project(
+            Comment.objects.visible().filter(post_id=id),
+            list(COMMENT_FIELDS),
+            COMMENT_FIELDS,
+        ),
+        settings.COMMENTS_PAGE_SIZE,
+        after=request.GET.get(CURSOR_AFTER),
+    )
+    return tag_response(
+        JsonResponse(
+            {
+                **serialize(row, fields, FIELDS),
+                'comments': page_data(
+                    comments,
+                    list(COMMENT_FIELDS),
+                    COMMENT_FIELDS,
+                ),
+            },
+        ),
+        (f'post:{id}', 'groups'),
+    )
+
+
+def parse_ids(request: HttpRequest) -> List[int]:
+    try:
+        ids = list(
+            dict.fromkeys(
+                int(value)
+                for value in request.GET.get('ids', '').split(',')
+                if value
+            ),
+        )
+    except ValueError:
+        raise ApiError('ids должен быть списком чисел', HTTPStatus.BAD_REQUEST)
+    if not ids:
+        raise ApiError('Не передан параметр ids', HTTPStatus.BAD_REQUEST)
+    if len(ids) > settings.API_BATCH_MAX_IDS:
+        raise ApiError(
+            f'Можно запросить не больше {settings.API_BATCH_MAX_IDS} постов',
+            HTTPStatus.BAD_REQUEST,
+        )
+    return ids
+
+
+def batch_tags(ids: Sequence[int]) -> List[str]:
+    return [*(f'post:{pk}' for pk in ids), 'groups']
+
+
+def batch_etag(request: HttpRequest) -> Optional[str]:
+    try:
+        ids = parse_ids(request)
+    except ApiError:
+        return None
+    return generation_etag(request, batch_tags(ids))
+
+
+def serialize_variant(image: ResponsiveImage) -> Optional[Dict[str, Any]]:
+    if not image:
+        return None
+    return {'src': image.url, 'srcset': image.srcset, 'sizes': image.sizes}
+
+
+def serialize_post(post: Post) -> Dict[str, Any]:
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'created': post.created.isoformat(),
+        'author': {
+            'username': post.author.username,
+            'full_name': post.author.get_full_name(),
+        },
+        'group': post.group and {
+            'slug': post.group.slug,
+            'title': post.group.title,
+        },
+        'image': post.image.url if post.image else None,
+        'thumbnails': {
+            name: serialize_variant(image)
+            for name, image in post.variants.items()
+        },
+    }
+
+
+@require_safe
+@condition(etag_func=batch_etag)
+def post_batch(request: HttpRequest) -> JsonResponse:
+    try:
+        ids = parse_ids(request)
+    except ApiError as error:
+        return error_response(error)
+    posts = (
+        Post.objects.visible()
+        .select_related('author', 'group')
+        .in_bulk(ids)
+    )
+    found = [posts[pk] for pk in ids if pk in posts]
+    prefetch_variants(found, *settings.THUMBNAIL_VARIANTS)
+    return tag_response(
+        JsonResponse(
+            {
+                'results': [serialize_post(post) for post in found],
+                'missing': [pk for pk in ids if pk not in posts],
+            },
+        ),
+        batch_tags(ids),
+    )
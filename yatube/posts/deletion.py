@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from core.background import run_in_background
+from core.utils import bump_generations
+from posts.models import (
+    Comment,
+    Deletion,
+    Follow,
+    Group,
+    Post,
+    TimelineEntry,
+    User,
+)
+
+Step = Tuple[QuerySet, Dict[str, Any]]
+
+
+def target_of(obj: Union[User, Group, Post]) -> str:
+    if isinstance(obj, User):
+        return Deletion.USER
+    if isinstance(obj, Group):
+        return Deletion.GROUP
+    return Deletion.POST
+
+
+def hide(target: str, object_id: int) -> None:
+    if target == Deletion.USER:
+        Post.objects.filter(author_id=object_id).update(
+            pending_deletion=True,
+        )
+        TimelineEntry.objects.filter(post__author_id=object_id).delete()
+        commented = (
+            Comment.objects.filter(author_id=object_id)
+            .order_by()
+            .values_list('post_id', flat=True)
+            .distinct()
+        )
+        tags = [
+            'posts',
+            f'author:{object_id}',
+            *(f'post:{post_id}' for post_id in commented),
+        ]
+    elif target == Deletion.GROUP:
+        Group.objects.filter(pk=object_id).update(pending_deletion=True)
+        tags = ['posts', 'groups', f'group:{object_id}']
+    else:
+        post = Post.objects.get(pk=object_id)
+        Post.objects.filter(pk=object_id).update(pending_deletion=True)
+        TimelineEntry.objects.filter(post_id=object_id).delete()
+        tags = ['posts', f'post:{object_id}', f'author:{post.author_id}']
+        if post.group_id:
+            tags.append(f'group:{post.group_id}')
+    bump_generations(tags)
+
+
+def schedule_deletion(obj: Union[User, Group, Post]) -> Deletion:
+    with transaction.atomic():
+        hide(target_of(obj), obj.pk)
+        deletion, _ = Deletion.objects.get_or_create(
+            target=target_of(obj),
+            object_id=obj.pk,
+        )
+    transaction.on_commit(
+        lambda: run_in_background(finish_deletion, deletion.pk),
+    )
+    return deletion
+
+
+def steps(deletion: Deletion) -> List[Step]:
+    object_id = deletion.object_id
+    if deletion.target == Deletion.USER:
+        return [
+            (Comment.objects.filter(author_id=object_id), {}),
+            (Comment.objects.filter(post__author_id=object_id), {}),
+            (TimelineEntry.objects.filter(post__author_id=object_id), {}),
+            (TimelineEntry.objects.filter(user_id=object_id), {}),
+            (Post.objects.filter(author_id=object_id), {}),
+            (Follow.objects.filter(user_id=object_id), {}),
+            (Follow.objects.filter(author_id=object_id), {}),
+            (User.objects.filter(pk=object_id), {}),
+        ]
+    if deletion.target == Deletion.GROUP:
+        return [
+            (Post.objects.filter(group_id=object_id), {'group': None}),
+            (Group.objects.filter(pk=object_id), {}),
+        ]
+    return [
+        (Comment.objects.filter(post_id=object_id), {}),
+        (Post.objects.filter(pk=object_id), {}),
+    ]
+
+
+def process_batch(
+    queryset: QuerySet,
+    values: Dict[str, Any],
+    pks: List[int],
+) -> None:
+    batch = queryset.model.objects.filter(pk__in=pks)
+    if not values:
+        batch.delete()
+        return
+    batch.update(**values)
+    bump_generations(['posts', *(f'post:{pk}' for pk in pks)])
+
+
+def run_deletion(
+    deletion: Deletion,
+    batch_size: int = settings.DELETION_BATCH_SIZE,
+) -> Iterator[int]:
+    for queryset, values in steps(deletion):
+        while True:
+            with transaction.atomic():
+                pks = list(
+                    queryset.order_by().values_list('pk', flat=True)[
+                        :batch_size
+                    ],
+                )
+                if not pks:
+                    break
+                process_batch(queryset, values, pks)
+                Deletion.objects.filter(pk=deletion.pk).update(
+                    removed=F('removed') + len(pks),
+                )
+            yield len(pks)
+    deletion.delete()
+
+
+def finish_deletion(deletion_pk: int) -> None:
+    deletion = Deletion.objects.filter(pk=deletion_pk).first()
+    if deletion is not None:
+        for _ in run_deletion(deletion):
+            pass
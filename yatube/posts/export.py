@@ -0,0 +1,56 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+COLUMNS = {
+    'id': 'id',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'text': 'text',
+    'created': 'created',
+    'image': 'image',
+}
+
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_rows(queryset: QuerySet) -> Iterator[Dict[str, Any]]:
+    for row in queryset.values_list(*COLUMNS.values()).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    ):
+        yield dict(zip(COLUMNS, row))
+
+
+def jsonl_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        row['created'] = row['created'].isoformat()
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    writer = csv.DictWriter(Echo(), fieldnames=list(COLUMNS))
+    yield writer.writeheader()
+    for row in rows:
+        row['created'] = row['created'].isoformat()
+        yield writer.writerow(row)
+
+
+SERIALIZERS = {
+    'jsonl': jsonl_lines,
+    'csv': csv_lines,
+}
+
+
+def export_lines(queryset: QuerySet, file_format: str) -> Iterator[str]:
+    return SERIALIZERS[file_format](export_rows(queryset))
@@ -1,5 +1,10 @@
+from typing import Optional
+
 from django import forms
+from django.core.files import File
 
+from core.thumbnails import schedule_variants
+from core.uploads import validate_image_header
 from posts.models import Comment, Post
 
 
@@ -16,6 +21,18 @@ class PostForm(forms.ModelForm):
             'password': 'Должен включать: заглавные/строчные буквы, цифры.',
         }
 
+    def clean_image(self) -> Optional[File]:
+        image = self.cleaned_data['image']
+        if hasattr(image, 'image'):
+            validate_image_header(image)
+        return image
+
+    def save(self, commit: bool = True) -> Post:
+        post = super().save(commit)
+        if commit and 'image' in self.changed_data and post.image:
+            schedule_variants(post.image.name, normalize=True)
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,282 @@
+import csv
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Type,
+)
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.utils import bump_generations
+from posts import media, timeline
+from posts.models import Comment, Follow, Group, Post, User
+from posts.stats import bump_stats
+
+FORMATS = ('jsonl', 'csv')
+
+Record = Dict[str, Any]
+
+
+class LookupMap:
+    def __init__(
+        self,
+        model: Type[Model],
+        field: str,
+        defaults: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    ) -> None:
+        self.model = model
+        self.field = field
+        self.defaults = defaults
+        self.ids: Dict[Any, int] = {}
+
+    def __getitem__(self, key: Any) -> int:
+        return self.ids[key]
+
+    def _fetch(self, keys: Iterable[Any]) -> None:
+        self.ids.update(
+            self.model.objects.filter(
+                **{f'{self.field}__in': keys},
+            ).values_list(self.field, 'pk'),
+        )
+
+    def resolve(self, keys: Iterable[Any]) -> None:
+        missing = {key for key in keys if key and key not in self.ids}
+        if not missing:
+            return
+        self._fetch(missing)
+        missing -= self.ids.keys()
+        if not missing or self.defaults is None:
+            return
+        self.model.objects.bulk_create(
+            (
+                self.model(**{self.field: key}, **self.defaults(key))
+                for key in missing
+            ),
+            ignore_conflicts=True,
+        )
+        self._fetch(missing)
+
+
+class Lookups(NamedTuple):
+    users: LookupMap
+    groups: LookupMap
+
+
+def lookups() -> Lookups:
+    return Lookups(
+        LookupMap(
+            User,
+            'username',
+            lambda _: {'password': make_password(None)},
+        ),
+        LookupMap(Group, 'slug', lambda slug: {'title': slug}),
+    )
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'csv' if extension == 'csv' else 'jsonl'
+
+
+def read_records(file: TextIO, file_format: str) -> Iterator[Record]:
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def batches(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_created(value: Optional[str]) -> datetime:
+    if not value:
+        return timezone.now()
+    created = parse_datetime(value)
+    if created is None:
+        raise ValueError(f'Некорректная дата: {value!r}')
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created)
+    return created
+
+
+def legacy_pks(
+    model: Type[Model],
+    legacy_ids: Iterable[int],
+) -> Dict[int, int]:
+    return dict(
+        model.objects.filter(legacy_id__in=list(legacy_ids)).values_list(
+            'legacy_id',
+            'pk',
+        ),
+    )
+
+
+def create_legacy(model: Type[Model], objects: List[Model]) -> None:
+    # auto_now_add перезаписывает дату при вставке, поэтому исходные даты
+    # проставляются отдельным обновлением по найденным pk.
+    created = [obj.created for obj in objects]
+    model.objects.bulk_create(objects)
+    pks = legacy_pks(model, (obj.legacy_id for obj in objects))
+    for obj, value in zip(objects, created):
+        obj.pk = pks[obj.legacy_id]
+        obj.created = value
+    model.objects.bulk_update(objects, ['created'])
+
+
+def import_posts(records: List[Record], maps: Lookups) -> int:
+    maps.users.resolve(record['author'] for record in records)
+    maps.groups.resolve(record.get('group') for record in records)
+    # Идентификаторы старой базы могут совпасть с локальными постами,
+    # поэтому новые посты получают свои pk, а старый id хранится отдельно.
+    records_by_id = {int(record['id']): record for record in records}
+    existing = legacy_pks(Post, records_by_id)
+    posts = [
+        Post(
+            legacy_id=legacy_id,
+            author_id=maps.users[record['author']],
+            group_id=(
+                maps.groups[record['group']] if record.get('group') else None
+            ),
+            text=record['text'],
+            image=record.get('image') or '',
+            created=parse_created(record.get('created')),
+        )
+        for legacy_id, record in records_by_id.items()
+        if legacy_id not in existing
+    ]
+    create_legacy(Post, posts)
+    timeline.fan_out_batch(posts)
+    for post in posts:
+        if post.image:
+            media.retain(post.image.name)
+    authors = Counter(post.author_id for post in posts)
+    for author_id, count in authors.items():
+        bump_stats(author_id, posts=count)
+    bump_generations(
+        {
+            'posts',
+            *(f'author:{author_id}' for author_id in authors),
+            *(f'group:{post.group_id}' for post in posts if post.group_id),
+        },
+    )
+    return len(posts)
+
+
+def import_comments(records: List[Record], maps: Lookups) -> int:
+    maps.users.resolve(record['author'] for record in records)
+    records_by_id = {int(record['id']): record for record in records}
+    existing = legacy_pks(Comment, records_by_id)
+    post_ids = legacy_pks(
+        Post,
+        {int(record['post']) for record in records_by_id.values()},
+    )
+    comments = [
+        Comment(
+            legacy_id=legacy_id,
+            author_id=maps.users[record['author']],
+            post_id=post_ids[int(record['post'])],
+            text=record['text'],
+            created=parse_created(record.get('created')),
+        )
+        for legacy_id, record in records_by_id.items()
+        if legacy_id not in existing
+    ]
+    create_legacy(Comment, comments)
+    authors = Counter(comment.author_id for comment in comments)
+    for author_id, count in authors.items():
+        bump_stats(author_id, comments=count)
+    bump_generations(
+        {'comments', *(f'post:{comment.post_id}' for comment in comments)},
+    )
+    return len(comments)
+
+
+def import_follows(records: List[Record], maps: Lookups) -> int:
+    maps.users.resolve(
+        username
+        for record in records
+        for username in (record['user'], record['author'])
+    )
+    pairs = {
+        (maps.users[record['user']], maps.users[record['author']])
+        for record in records
+        if record['user'] != record['author']
+    }
+    existing = set(
+        Follow.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            author_id__in={author_id for _, author_id in pairs},
+        ).values_list('user_id', 'author_id'),
+    )
+    follows = [
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in pairs - existing
+    ]
+    Follow.objects.bulk_create(follows, ignore_conflicts=True)
+    for user_id, count in Counter(
+        follow.user_id for follow in follows
+    ).items():
+        bump_stats(user_id, following=count)
+    for author_id, count in Counter(
+        follow.author_id for follow in follows
+    ).items():
+        bump_stats(author_id, followers=count)
+    timeline.backfill_batch(follows)
+    bump_generations(
+        {
+            tag
+            for follow in follows
+            for tag in (
+                f'follow:{follow.user_id}',
+                f'followers:{follow.author_id}',
+            )
+        },
+    )
+    return len(follows)
+
+
+IMPORTERS = {
+    'posts': import_posts,
+    'comments': import_comments,
+    'follows': import_follows,
+}
+
+
+def load_checkpoint(path: str, source: str, kind: str) -> int:
+    try:
+        with open(path) as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return 0
+    if checkpoint.get('source') != source or checkpoint.get('kind') != kind:
+        return 0
+    return checkpoint['records']
+
+
+def save_checkpoint(path: str, source: str, kind: str, records: int) -> None:
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump({'source': source, 'kind': kind, 'records': records}, file)
+    os.replace(f'{path}.tmp', path)
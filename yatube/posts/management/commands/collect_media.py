@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.media import collect
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы изображений, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=settings.MEDIA_COLLECT_GRACE,
+            help='Сколько секунд файл без ссылок не трогается.',
+        )
+
+    def handle(self, *args, **options):
+        collected = 0
+        for name in collect(timedelta(seconds=options['grace'])):
+            collected += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово. Удалено файлов: {collected}'),
+        )
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterator
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import SERIALIZERS, export_rows
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты автора, группы или всего сайта в JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument('--author', help='Имя пользователя.')
+        source.add_argument('--group', help='Slug группы.')
+        parser.add_argument('--format', choices=SERIALIZERS, default='jsonl')
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки, по умолчанию стандартный вывод.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['author']:
+                queryset = User.objects.get(
+                    username=options['author'],
+                ).posts.visible()
+            elif options['group']:
+                queryset = Group.objects.get(
+                    slug=options['group'],
+                ).posts.visible()
+            else:
+                queryset = Post.objects.visible()
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(error)
+        exported = 0
+
+        def counted_rows() -> Iterator[Dict[str, Any]]:
+            nonlocal exported
+            for row in export_rows(queryset):
+                exported += 1
+                yield row
+
+        lines = SERIALIZERS[options['format']](counted_rows())
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(
+            options['output'],
+            'w',
+            newline='',
+            encoding='utf-8',
+        ) as file:
+            file.writelines(lines)
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово. Выгружено постов: {exported}'),
+        )
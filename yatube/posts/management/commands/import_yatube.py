@@ -0,0 +1,81 @@
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from posts.importing import (
+    FORMATS,
+    IMPORTERS,
+    batches,
+    detect_format,
+    load_checkpoint,
+    lookups,
+    read_records,
+    save_checkpoint,
+)
+
+
+class Command(BaseCommand):
+    help = 'Импортирует посты, комментарии или подписки из JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORTERS)
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с числом уже импортированных записей.',
+        )
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        source = os.path.abspath(options['path'])
+        checkpoint = options['checkpoint'] or f'{source}.checkpoint'
+        importer = IMPORTERS[kind]
+        maps = lookups()
+        done = skipped = load_checkpoint(checkpoint, source, kind)
+        if skipped:
+            self.stdout.write(f'Продолжение с записи {skipped + 1}')
+        imported = 0
+        started = time.monotonic()
+        with open(source, newline='', encoding='utf-8') as file:
+            records = islice(
+                read_records(
+                    file,
+                    options['format'] or detect_format(source),
+                ),
+                skipped,
+                None,
+            )
+            for batch in batches(records, options['batch_size']):
+                try:
+                    with transaction.atomic():
+                        imported += importer(batch, maps)
+                except (KeyError, ValueError, DatabaseError) as error:
+                    raise CommandError(
+                        f'Ошибка в записях {done + 1}–{done + len(batch)}: '
+                        f'{error!r}. Повторный запуск продолжит с записи '
+                        f'{done + 1}.',
+                    )
+                done += len(batch)
+                save_checkpoint(checkpoint, source, kind, done)
+                rate = (done - skipped) / (time.monotonic() - started)
+                self.stdout.write(
+                    f'{kind}: обработано {done}, {rate:.0f} записей/с',
+                )
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Готово. Импортировано: {imported} за {elapsed:.1f} с '
+                f'({(done - skipped) / max(elapsed, 1e-6):.0f} записей/с)',
+            ),
+        )
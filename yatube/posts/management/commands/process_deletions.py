@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.deletion import run_deletion
+from posts.models import Deletion
+
+
+class Command(BaseCommand):
+    help = 'Завершает отложенные удаления пользователей, групп и постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.DELETION_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        finished = 0
+        for deletion in Deletion.objects.order_by('created'):
+            processed = deletion.removed
+            for count in run_deletion(deletion, options['batch_size']):
+                processed += count
+                self.stdout.write(f'{deletion}: обработано {processed}')
+            finished += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово. Завершено удалений: {finished}'),
+        )
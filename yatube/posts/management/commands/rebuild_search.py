@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+COMMAND = 'INSERT INTO posts_post_fts(posts_post_fts) VALUES (%s)'
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов.'
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute(COMMAND, ['rebuild'])
+            cursor.execute(COMMAND, ['optimize'])
+        self.stdout.write(self.style.SUCCESS('Готово. Индекс перестроен.'))
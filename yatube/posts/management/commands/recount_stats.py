@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.stats import repair_stats, user_ids_batches
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        checked = repaired = 0
+        for batch in user_ids_batches(options['batch_size']):
+            with transaction.atomic():
+                repaired += len(repair_stats(batch))
+            checked += len(batch)
+            self.stdout.write(f'Проверено: {checked}, исправлено: {repaired}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Готово. Проверено: {checked}, исправлено: {repaired}',
+            ),
+        )
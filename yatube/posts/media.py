@@ -0,0 +1,61 @@
+from datetime import timedelta
+from typing import Iterator
+
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import MediaFile
+
+
+def retain(name: str, count: int = 1) -> None:
+    updated = MediaFile.objects.filter(name=name).update(
+        references=F('references') + count,
+        modified=timezone.now(),
+    )
+    if updated:
+        return
+    _, created = MediaFile.objects.get_or_create(
+        name=name,
+        defaults={'references': count},
+    )
+    if not created:
+        retain(name, count)
+
+
+def release(name: str, count: int = 1) -> None:
+    MediaFile.objects.filter(name=name, references__gt=0).update(
+        references=Greatest(F('references') - count, 0),
+        modified=timezone.now(),
+    )
+
+
+def move(old_name: str, new_name: str, count: int) -> None:
+    if count:
+        retain(new_name, count)
+        release(old_name, count)
+
+
+def collect(grace: timedelta) -> Iterator[str]:
+    cutoff = timezone.now() - grace
+    names = MediaFile.objects.filter(
+        references=0,
+        modified__lt=cutoff,
+    ).values_list('name', flat=True)
+    for name in names.iterator():
+        if default_storage.exists(name) and (
+            default_storage.get_modified_time(name) >= cutoff
+        ):
+            continue
+        deleted, _ = MediaFile.objects.filter(
+            name=name,
+            references=0,
+        ).delete()
+        if not deleted:
+            continue
+        if default_storage.exists(name):
+            delete(ImageFile(name, default_storage))
+        yield name
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_userstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='имя файла')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='ссылок')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'медиафайл',
+                'verbose_name_plural': 'медиафайлы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediafile',
+            index=models.Index(fields=['references', 'modified'], name='media_file_garbage'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:37
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_search = import_module('posts.migrations.0015_post_search')
+
+# SQLite пересоздаёт posts_post при добавлении поля, триггеры теряются.
+TRIGGERS = post_search.DROP[:3] + post_search.CREATE[1:4]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('user', 'пользователь'), ('group', 'группа'), ('post', 'пост')], max_length=5, verbose_name='объект')),
+                ('object_id', models.PositiveIntegerField(verbose_name='идентификатор')),
+                ('removed', models.PositiveIntegerField(default=0, verbose_name='обработано строк')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'удаление',
+                'verbose_name_plural': 'удаления',
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='pending_deletion',
+            field=models.BooleanField(default=False, editable=False, verbose_name='ожидает удаления'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='pending_deletion',
+            field=models.BooleanField(default=False, editable=False, verbose_name='ожидает удаления'),
+        ),
+        migrations.RunPython(
+            post_search.run(TRIGGERS),
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['pending_deletion', 'created'], name='post_pending_created'),
+        ),
+        migrations.AddConstraint(
+            model_name='deletion',
+            constraint=models.UniqueConstraint(fields=('target', 'object_id'), name='deletion_target'),
+        ),
+    ]
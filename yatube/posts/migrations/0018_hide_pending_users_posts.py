@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def hide_posts(apps, schema_editor):
+    Deletion = apps.get_model('posts', 'Deletion')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    users = Deletion.objects.filter(target='user').values('object_id')
+    Post.objects.filter(author_id__in=users).update(pending_deletion=True)
+    TimelineEntry.objects.filter(post__author_id__in=users).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_pending_deletion'),
+    ]
+
+    operations = [
+        migrations.RunPython(hide_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserStats = apps.get_model('posts', 'UserStats')
+    counted = (
+        ('posts', apps.get_model('posts', 'Post'), 'author_id'),
+        ('comments', apps.get_model('posts', 'Comment'), 'author_id'),
+        ('followers', apps.get_model('posts', 'Follow'), 'author_id'),
+        ('following', apps.get_model('posts', 'Follow'), 'user_id'),
+    )
+    fields = [field for field, _, _ in counted]
+    last_pk = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE],
+        )
+        if not user_ids:
+            return
+        counts = {user_id: dict.fromkeys(fields, 0) for user_id in user_ids}
+        for field, model, column in counted:
+            rows = (
+                model.objects.filter(**{f'{column}__in': user_ids})
+                .order_by()
+                .values(column)
+                .annotate(total=Count('pk'))
+                .values_list(column, 'total')
+            )
+            for user_id, total in rows:
+                counts[user_id][field] = total
+        existing = UserStats.objects.in_bulk(user_ids)
+        for stats in existing.values():
+            for field, value in counts[stats.pk].items():
+                setattr(stats, field, value)
+        UserStats.objects.bulk_update(existing.values(), fields)
+        UserStats.objects.bulk_create(
+            UserStats(user_id=user_id, **actual)
+            for user_id, actual in counts.items()
+            if user_id not in existing
+        )
+        last_pk = user_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_hide_pending_users_posts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:22
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_search = import_module('posts.migrations.0015_post_search')
+
+# SQLite пересоздаёт posts_post при добавлении поля, триггеры теряются.
+TRIGGERS = post_search.DROP[:3] + post_search.CREATE[1:4]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_backfill_userstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='legacy_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='идентификатор при импорте'),
+        ),
+        migrations.RunPython(
+            post_search.run(TRIGGERS),
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_post_legacy_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='legacy_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='идентификатор при импорте'),
+        ),
+    ]
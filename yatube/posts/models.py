@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import QuerySet
 
 from core.models import TextAuthor, TimestampedModel
 from core.utils import truncatechars
@@ -19,11 +20,21 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='описание',
     )
+    pending_deletion = models.BooleanField(
+        'ожидает удаления',
+        default=False,
+        editable=False,
+    )
 
     def __str__(self) -> str:
         return truncatechars(self.title)
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self) -> 'PostQuerySet':
+        return self.filter(pending_deletion=False)
+
+
 class Post(TextAuthor):
     group = models.ForeignKey(
         Group,
@@ -38,16 +49,49 @@ class Post(TextAuthor):
         upload_to='posts/',
         blank=True,
     )
+    pending_deletion = models.BooleanField(
+        'ожидает удаления',
+        default=False,
+        editable=False,
+    )
+    legacy_id = models.PositiveIntegerField(
+        'идентификатор при импорте',
+        blank=True,
+        null=True,
+        unique=True,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(TimestampedModel.Meta):
         default_related_name = 'posts'
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
+        indexes = [
+            models.Index(
+                fields=['author', 'created'],
+                name='post_author_created',
+            ),
+            models.Index(
+                fields=['group', 'created'],
+                name='post_group_created',
+            ),
+            models.Index(
+                fields=['pending_deletion', 'created'],
+                name='post_pending_created',
+            ),
+        ]
 
     def __str__(self) -> str:
         return truncatechars(self.text)
 
 
+class CommentQuerySet(models.QuerySet):
+    def visible(self) -> 'CommentQuerySet':
+        return self.exclude(author_id__in=pending_user_ids())
+
+
 class Comment(TextAuthor):
     post = models.ForeignKey(
         Post,
@@ -55,6 +99,15 @@ class Comment(TextAuthor):
         blank=True,
         help_text='комментарий к посту',
     )
+    legacy_id = models.PositiveIntegerField(
+        'идентификатор при импорте',
+        blank=True,
+        null=True,
+        unique=True,
+        editable=False,
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self) -> str:
         return f'{self.text}, автор: {self.author}'
@@ -62,6 +115,12 @@ class Comment(TextAuthor):
     class Meta(TimestampedModel.Meta):
         default_related_name = 'comments'
         verbose_name = 'комментарий'
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created',
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -83,3 +142,109 @@ class Follow(models.Model):
                 name='subscribe',
             ),
         ]
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    created = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='timeline_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'created', 'post'],
+                name='timeline_user_created',
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts = models.PositiveIntegerField('постов', default=0)
+    comments = models.PositiveIntegerField('комментариев', default=0)
+    followers = models.PositiveIntegerField('подписчиков', default=0)
+    following = models.PositiveIntegerField('подписок', default=0)
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'статистика пользователей'
+
+    def __str__(self) -> str:
+        return f'статистика {self.user}'
+
+
+class MediaFile(models.Model):
+    name = models.CharField('имя файла', max_length=255, primary_key=True)
+    references = models.PositiveIntegerField('ссылок', default=0)
+    modified = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        verbose_name = 'медиафайл'
+        verbose_name_plural = 'медиафайлы'
+        indexes = [
+            models.Index(
+                fields=['references', 'modified'],
+                name='media_file_garbage',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Deletion(models.Model):
+    USER = 'user'
+    GROUP = 'group'
+    POST = 'post'
+    TARGETS = (
+        (USER, 'пользователь'),
+        (GROUP, 'группа'),
+        (POST, 'пост'),
+    )
+
+    target = models.CharField('объект', max_length=5, choices=TARGETS)
+    object_id = models.PositiveIntegerField('идентификатор')
+    removed = models.PositiveIntegerField('обработано строк', default=0)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'удаление'
+        verbose_name_plural = 'удаления'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target', 'object_id'],
+                name='deletion_target',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.get_target_display()} {self.object_id}'
+
+
+def pending_user_ids() -> QuerySet:
+    return Deletion.objects.filter(target=Deletion.USER).values('object_id')
+
+
+def visible_users() -> QuerySet:
+    return User.objects.exclude(pk__in=pending_user_ids())
@@ -0,0 +1,140 @@
+import base64
+import re
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from core.utils import CursorPage
+from posts.models import Post
+
+MARK_START = '\x02'
+MARK_END = '\x03'
+WORD_RE = re.compile(r'\w+')
+
+
+class SearchPage(CursorPage):
+    def __init__(
+        self,
+        object_list: List[Post],
+        has_next: bool,
+        has_previous: bool,
+        next_cursor: Optional[str],
+    ) -> None:
+        super().__init__(object_list, has_next, has_previous)
+        self._next_cursor = next_cursor
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        return self._next_cursor if self._has_next else None
+
+    @property
+    def previous_cursor(self) -> None:
+        return None
+
+
+def match_expression(query: str) -> Optional[str]:
+    words = WORD_RE.findall(query.lower())[: settings.SEARCH_MAX_TERMS]
+    if not words:
+        return None
+    *exact, prefix = words
+    return ' '.join((*(f'"{word}"' for word in exact), f'"{prefix}"*'))
+
+
+def encode_search_cursor(rank: float, pk: int) -> str:
+    raw = f'{rank!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(token: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4),
+        ).decode()
+        rank, pk = raw.rsplit('|', 1)
+        return float(rank), int(pk)
+    except (ValueError, TypeError):
+        raise ValueError(f'Некорректный курсор: {token!r}')
+
+
+def highlight(snippet: str) -> SafeString:
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>'),
+    )
+
+
+def search_posts(
+    query: str,
+    group_id: Optional[int] = None,
+    author_id: Optional[int] = None,
+    after: Optional[str] = None,
+    quantity: int = settings.PAGE_SIZE,
+) -> SearchPage:
+    expression = match_expression(query)
+    if expression is None:
+        return SearchPage([], False, False, None)
+    conditions = [
+        'posts_post_fts MATCH %s',
+        'NOT posts_post.pending_deletion',
+    ]
+    params = [expression]
+    if group_id is not None:
+        conditions.append('posts_post.group_id = %s')
+        params.append(group_id)
+    if author_id is not None:
+        conditions.append('posts_post.author_id = %s')
+        params.append(author_id)
+    try:
+        rank, pk = decode_search_cursor(after) if after else (None, None)
+    except ValueError:
+        rank = pk = None
+    if rank is not None:
+        conditions.append(
+            '(posts_post_fts.rank > %s '
+            'OR (posts_post_fts.rank = %s AND posts_post_fts.rowid > %s))',
+        )
+        params.extend((rank, rank, pk))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT posts_post_fts.rowid, posts_post_fts.rank, '
+            'snippet(posts_post_fts, 0, %s, %s, %s, %s) '
+            'FROM posts_post_fts '
+            'JOIN posts_post ON posts_post.id = posts_post_fts.rowid '
+            f'WHERE {" AND ".join(conditions)} '
+            'ORDER BY posts_post_fts.rank, posts_post_fts.rowid '
+            'LIMIT %s',
+            [
+                MARK_START,
+                MARK_END,
+                '…',
+                settings.SEARCH_SNIPPET_TOKENS,
+                *params,
+                quantity + 1,
+            ],
+        )
+        rows = cursor.fetchall()
+    has_next = len(rows) > quantity
+    rows = rows[:quantity]
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [row[0] for row in rows],
+    )
+    results = []
+    for pk, _, snippet in rows:
+        post = posts.get(pk)
+        if post is None:
+            continue
+        post.snippet = highlight(snippet)
+        results.append(post)
+    last_pk, last_rank, _ = rows[-1] if rows else (None, None, None)
+    return SearchPage(
+        results,
+        has_next=has_next,
+        has_previous=rank is not None,
+        next_cursor=(
+            encode_search_cursor(last_rank, last_pk) if rows else None
+        ),
+    )
@@ -0,0 +1,182 @@
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.signals import image_replaced, variants_generated
+from core.utils import bump_generations
+from posts import media, timeline
+from posts.models import Comment, Follow, Group, Post
+from posts.stats import bump_stats
+
+
+def post_tags(pk: int, author_id: int, group_id: Optional[int]) -> List[str]:
+    tags = ['posts', f'post:{pk}', f'author:{author_id}']
+    if group_id:
+        tags.append(f'group:{group_id}')
+    return tags
+
+
+def image_posts(image_name: str) -> List[Tuple[int, int, Optional[int]]]:
+    return list(
+        Post.objects.filter(image=image_name).values_list(
+            'pk',
+            'author_id',
+            'group_id',
+        ),
+    )
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_post_generations(sender, instance: Post, **kwargs) -> None:
+    tags = post_tags(instance.pk, instance.author_id, instance.group_id)
+    previous_group_id = getattr(instance, '_stored_group_id', None)
+    if previous_group_id and previous_group_id != instance.group_id:
+        tags.append(f'group:{previous_group_id}')
+    bump_generations(tags)
+
+
+@receiver((post_save, post_delete), sender=Group)
+def invalidate_group_generations(sender, instance: Group, **kwargs) -> None:
+    bump_generations(('groups', f'group:{instance.pk}'))
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_comment_generations(
+    sender,
+    instance: Comment,
+    **kwargs,
+) -> None:
+    bump_generations(('comments', f'post:{instance.post_id}'))
+
+
+@receiver((post_save, post_delete), sender=Follow)
+def invalidate_follow_counts(sender, instance: Follow, **kwargs) -> None:
+    bump_generations(
+        (f'follow:{instance.user_id}', f'followers:{instance.author_id}'),
+    )
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance: Post, created: bool, **kwargs) -> None:
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(
+    sender,
+    instance: Follow,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance: Follow, **kwargs) -> None:
+    timeline.unfollow(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(
+    sender,
+    instance: Post,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created:
+        bump_stats(instance.author_id, posts=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance: Post, **kwargs) -> None:
+    bump_stats(instance.author_id, posts=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(
+    sender,
+    instance: Comment,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created:
+        bump_stats(instance.author_id, comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance: Comment, **kwargs) -> None:
+    bump_stats(instance.author_id, comments=-1)
+
+
+@receiver(post_save, sender=Follow)
+def count_created_follow(
+    sender,
+    instance: Follow,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created:
+        bump_stats(instance.user_id, following=1)
+        bump_stats(instance.author_id, followers=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance: Follow, **kwargs) -> None:
+    bump_stats(instance.user_id, following=-1)
+    bump_stats(instance.author_id, followers=-1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_stored(sender, instance: Post, **kwargs) -> None:
+    instance._stored_image, instance._stored_group_id = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list('image', 'group_id')
+        .first()
+        if instance.pk
+        else None
+    ) or ('', None)
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance: Post, **kwargs) -> None:
+    previous = getattr(instance, '_stored_image', None) or ''
+    if instance.image.name == previous:
+        return
+    if instance.image:
+        media.retain(instance.image.name)
+    if previous:
+        media.release(previous)
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance: Post, **kwargs) -> None:
+    if instance.image:
+        media.release(instance.image.name)
+
+
+@receiver(image_replaced)
+def replace_post_image(
+    sender,
+    old_name: str,
+    new_name: str,
+    **kwargs,
+) -> None:
+    with transaction.atomic():
+        posts = image_posts(old_name)
+        updated = Post.objects.filter(
+            pk__in=[pk for pk, _, _ in posts],
+            image=old_name,
+        ).update(image=new_name)
+        media.move(old_name, new_name, updated)
+    bump_generations({tag for post in posts for tag in post_tags(*post)})
+
+
+@receiver(variants_generated)
+def invalidate_image_generations(sender, image_name: str, **kwargs) -> None:
+    bump_generations(
+        {tag for post in image_posts(image_name) for tag in post_tags(*post)},
+    )
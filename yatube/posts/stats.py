@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from posts.models import Comment, Follow, Post, User, UserStats
+
+COUNTED = (
+    ('posts', Post, 'author_id'),
+    ('comments', Comment, 'author_id'),
+    ('followers', Follow, 'author_id'),
+    ('following', Follow, 'user_id'),
+)
+
+
+def bump_stats(user_id: int, **deltas: int) -> None:
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        },
+    )
+    if updated or min(deltas.values()) < 0:
+        return
+    _, created = UserStats.objects.get_or_create(
+        user_id=user_id,
+        defaults=deltas,
+    )
+    if not created:
+        bump_stats(user_id, **deltas)
+
+
+def count_stats(user_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    user_ids = list(user_ids)
+    counts = {
+        user_id: {field: 0 for field, _, _ in COUNTED}
+        for user_id in user_ids
+    }
+    for field, model, column in COUNTED:
+        rows = (
+            model.objects.filter(**{f'{column}__in': user_ids})
+            .order_by()
+            .values(column)
+            .annotate(total=Count('pk'))
+            .values_list(column, 'total')
+        )
+        for user_id, total in rows:
+            counts[user_id][field] = total
+    return counts
+
+
+def repair_stats(user_ids: Iterable[int]) -> List[UserStats]:
+    counts = count_stats(user_ids)
+    existing = UserStats.objects.in_bulk(counts)
+    drifted = []
+    missing = []
+    for user_id, actual in counts.items():
+        stats = existing.get(user_id)
+        if stats is None:
+            missing.append(UserStats(user_id=user_id, **actual))
+            continue
+        if any(
+            getattr(stats, field) != value for field, value in actual.items()
+        ):
+            for field, value in actual.items():
+                setattr(stats, field, value)
+            drifted.append(stats)
+    UserStats.objects.bulk_update(drifted, [field for field, _, _ in COUNTED])
+    UserStats.objects.bulk_create(missing, ignore_conflicts=True)
+    return drifted + missing
+
+
+def user_ids_batches(batch_size: int) -> Iterable[List[int]]:
+    last_pk = 0
+    while True:
+        batch = list(
+            User.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size],
+        )
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
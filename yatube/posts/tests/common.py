@@ -1,12 +1,16 @@
 from io import BytesIO
+from typing import Tuple
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
 
-def image(name: str = 'test.gif') -> SimpleUploadedFile:
+def image(
+    name: str = 'test.gif',
+    color: Tuple[int, int, int] = (155, 0, 0),
+) -> SimpleUploadedFile:
     uploaded = BytesIO()
-    Image.new('RGBA', size=(1, 1), color=(155, 0, 0)).save(
+    Image.new('RGBA', size=(1, 1), color=color).save(
         uploaded,
         'gif',
     )
@@ -0,0 +1,51 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Comment, Group, Post, User
+
+
+@override_settings(ADMIN_EXCERPT_LENGTH=10)
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin',
+            'admin@example.com',
+            'password',
+        )
+        cls.group = mixer.blend(Group)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, model) -> int:
+        url = reverse(f'admin:posts_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов страницы админки не зависит от числа строк."""
+        for model in (Post, Comment):
+            with self.subTest(model=model.__name__):
+                post = mixer.blend(Post, group=self.group)
+                mixer.blend(Comment, post=post)
+                few = self.changelist_queries(model)
+                posts = mixer.cycle(5).blend(Post, group=self.group)
+                mixer.cycle(5).blend(Comment, post=(post for post in posts))
+                self.assertEqual(self.changelist_queries(model), few)
+
+    def test_changelist_shows_excerpt_and_searches_index(self):
+        """Текст обрезается, поиск идёт по полнотекстовому индексу."""
+        Post.objects.create(author=self.admin, text='Длинный текст о котиках')
+        Post.objects.create(author=self.admin, text='Про собак')
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url)
+        self.assertContains(response, 'Длинный те…')
+        self.assertNotContains(response, 'о котиках')
+        response = self.client.get(url, {'q': 'котик'})
+        self.assertEqual(response.context['cl'].result_count, 1)
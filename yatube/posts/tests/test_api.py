@@ -0,0 +1,156 @@
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Comment, Follow, Group, Post, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author, cls.reader = mixer.cycle(2).blend(User)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(12).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_selected_fields_in_one_query(self):
+        """Лента отдаёт только запрошенные поля одним запросом."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('posts:api_index'),
+                {'fields': 'id,author', 'limit': 5},
+            )
+        data = response.json()
+        self.assertEqual(
+            data['results'][0],
+            {'id': self.posts[-1].pk, 'author': self.author.username},
+        )
+        self.assertEqual(len(data['results']), 5)
+        response = self.client.get(
+            reverse('posts:api_index'),
+            {'fields': 'id', 'limit': 10, 'after': data['next']},
+        )
+        self.assertEqual(
+            [row['id'] for row in response.json()['results']],
+            [post.pk for post in reversed(self.posts[:7])],
+        )
+
+    def test_feeds_by_group_profile_and_follow(self):
+        """Ленты группы, профиля и подписок возвращают посты автора."""
+        self.client.force_login(self.reader)
+        for url in (
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_profile', args=(self.author.username,)),
+            reverse('posts:api_follow_index'),
+        ):
+            with self.subTest(url=url):
+                results = self.client.get(url).json()['results']
+                self.assertEqual(results[0]['group'], self.group.slug)
+                self.assertEqual(len(results), 10)
+
+    def test_errors(self):
+        """Неизвестные поля, чужие ленты и отсутствующие объекты."""
+        cases = (
+            (
+                reverse('posts:api_index'),
+                {'fields': 'password'},
+                HTTPStatus.BAD_REQUEST,
+            ),
+            (reverse('posts:api_follow_index'), {}, HTTPStatus.UNAUTHORIZED),
+            (
+                reverse('posts:api_group_list', args=('missing',)),
+                {},
+                HTTPStatus.NOT_FOUND,
+            ),
+        )
+        for url, data, status in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url, data)
+                self.assertEqual(response.status_code, status)
+
+    def test_post_detail_with_comments(self):
+        """Пост отдаётся вместе с первой страницей комментариев."""
+        post = self.posts[0]
+        comment = Comment.objects.create(
+            post=post,
+            author=self.reader,
+            text='Ок',
+        )
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=(post.pk,)),
+        ).json()
+        self.assertEqual(data['text'], post.text)
+        self.assertEqual(data['image'], post.image.url)
+        self.assertEqual(
+            data['comments']['results'][0]['author'],
+            comment.author.username,
+        )
+
+
+class PostBatchApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(6).blend(Post, group=cls.group, image='')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, ids):
+        return self.client.get(
+            reverse('posts:api_post_batch'),
+            {'ids': ','.join(map(str, ids))},
+        )
+
+    def test_order_and_missing_ids(self):
+        """Посты возвращаются в порядке запроса, пропуски перечисляются."""
+        ids = [self.posts[3].pk, 0, self.posts[1].pk, self.posts[3].pk]
+        data = self.get(ids).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[3].pk, self.posts[1].pk],
+        )
+        self.assertEqual(data['missing'], [0])
+        self.assertEqual(
+            data['results'][0]['group']['slug'],
+            self.group.slug,
+        )
+
+    def test_constant_number_of_queries(self):
+        """Число запросов не зависит от количества постов."""
+        with CaptureQueriesContext(connection) as single:
+            self.get([self.posts[0].pk])
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            self.get([post.pk for post in self.posts])
+        self.assertEqual(len(single), len(many))
+
+    @override_settings(API_BATCH_MAX_IDS=2)
+    def test_too_many_ids(self):
+        """Слишком длинный список идентификаторов отклоняется."""
+        response = self.get([post.pk for post in self.posts])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
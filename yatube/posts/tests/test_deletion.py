@@ -0,0 +1,91 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.deletion import schedule_deletion
+from posts.models import Comment, Deletion, Follow, Group, Post, User
+
+
+class DeletionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author, cls.reader = mixer.cycle(2).blend(User)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(3).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+        )
+        mixer.cycle(3).blend(Comment, post=cls.posts[0], author=cls.reader)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def process(self):
+        call_command('process_deletions', batch_size=2, stdout=StringIO())
+        self.assertFalse(Deletion.objects.exists())
+
+    def test_user_hidden_then_removed_in_batches(self):
+        """Пользователь скрывается сразу, а удаляется пачками."""
+        schedule_deletion(self.author)
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.process()
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(self.reader.stats.following, 0)
+
+    def test_group_hidden_and_posts_detached(self):
+        """Посты удаляемой группы остаются, но теряют группу."""
+        schedule_deletion(self.group)
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,)),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.process()
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(
+            Post.objects.filter(group__isnull=True).count(),
+            len(self.posts),
+        )
+
+    def test_post_hidden_then_removed(self):
+        """Пост пропадает из ленты сразу, комментарии удаляются с ним."""
+        post = self.posts[0]
+        schedule_deletion(post)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,)),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertNotIn(post, response.context['page_obj'])
+        self.process()
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_pending_user_comments_hidden(self):
+        """Комментарии удаляемого пользователя скрываются сразу."""
+        url = reverse('posts:post_detail', args=(self.posts[0].pk,))
+        self.assertEqual(len(self.client.get(url).context['comments']), 3)
+        schedule_deletion(self.reader)
+        self.assertEqual(len(self.client.get(url).context['comments']), 0)
+
+    def test_inactive_user_stays_visible(self):
+        """Неактивный пользователь не считается удаляемым."""
+        User.objects.filter(pk=self.author.pk).update(is_active=False)
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            len(response.context['page_obj']),
+            len(self.posts),
+        )
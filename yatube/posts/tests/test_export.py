@@ -0,0 +1,86 @@
+import json
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Group, Post, User
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User, username='author')
+        cls.group = mixer.blend(Group, slug='group')
+        cls.posts = mixer.cycle(3).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+            text=mixer.sequence('Пост {0}'),
+        )
+
+    def test_profile_export_streams_jsonl(self):
+        """Выгрузка профиля отдаётся потоком JSONL."""
+        response = self.client.get(
+            reverse('posts:profile_export', args=('author', 'jsonl')),
+        )
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [post.pk for post in reversed(self.posts)],
+        )
+        self.assertEqual(rows[0]['author'], 'author')
+        self.assertEqual(rows[0]['group'], 'group')
+
+    def test_unknown_export_format(self):
+        """Неизвестный формат выгрузки возвращает 404."""
+        response = self.client.get(
+            reverse('posts:group_export', args=('group', 'xml')),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_export_command_skips_hidden_posts(self):
+        """Выгрузка сайта пропускает удаляемые посты и считает записи."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'site.csv')
+        Post.objects.filter(pk=self.posts[0].pk).update(pending_deletion=True)
+        stdout = StringIO()
+        call_command('export_yatube', format='csv', output=path, stdout=stdout)
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), len(self.posts))
+        self.assertIn(
+            f'Выгружено постов: {len(self.posts) - 1}',
+            stdout.getvalue(),
+        )
+
+    def test_export_command_round_trip(self):
+        """CSV из export_yatube загружается обратно через import_yatube."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'group.csv')
+        call_command(
+            'export_yatube',
+            group='group',
+            format='csv',
+            output=path,
+            stdout=StringIO(),
+        )
+        expected = list(Post.objects.values_list('pk', 'text', 'created'))
+        Post.objects.all().delete()
+        call_command('import_yatube', 'posts', path, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.values_list('legacy_id', 'text', 'created')),
+            expected,
+        )
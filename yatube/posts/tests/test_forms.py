@@ -1,10 +1,19 @@
+import hashlib
+import os
 import shutil
+from http import HTTPStatus
+from io import BytesIO
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from mixer.backend.django import mixer
+from PIL import Image
 
+from core.thumbnails import generate_variants, lookup_variant
+from core.uploads import EXIF_ORIENTATION, normalize_image
 from posts.models import Comment, Group, Post, User
 from posts.tests.common import image
 
@@ -44,7 +53,79 @@ class PostFormTests(TestCase):
         post = Post.objects.get()
         self.assertEqual(post.text, 'Тестовый пост')
         self.assertEqual(post.group, self.group)
-        self.assertTrue(post.image.name.endswith(image().name))
+        self.assertTrue(post.image.name.startswith('posts/'))
+
+    def test_post_create_pregenerates_thumbnails(self):
+        """Миниатюры создаются заранее и берутся из хранилища."""
+        self.auth.post(
+            reverse('posts:post_create'),
+            {'text': 'Тестовый пост', 'image': image()},
+        )
+        post = Post.objects.get()
+        self.assertTrue(cache.get(f'thumbnail-pending:{post.image.name}'))
+        generate_variants(post.image.name)
+        for name in settings.THUMBNAIL_VARIANTS:
+            with self.subTest(name=name):
+                variant = lookup_variant(post.image, name)
+                self.assertTrue(variant.src.name.startswith('cache/'))
+                self.assertEqual(
+                    [source['type'] for source in variant.sources],
+                    ['image/webp'],
+                )
+                self.assertIsNotNone(variant.width)
+        response = self.auth.get(
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        card = lookup_variant(post.image, 'card')
+        self.assertContains(response, card.url)
+        self.assertContains(response, f'srcset="{card.srcset}"')
+        self.assertContains(response, 'loading="lazy"')
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=16)
+    def test_post_create_rejects_oversized_image(self):
+        """Слишком большой файл обрывает загрузку."""
+        response = self.auth.post(
+            reverse('posts:post_create'),
+            {'text': 'Тестовый пост', 'image': image()},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(IMAGE_MAX_PIXELS=0)
+    def test_post_create_rejects_huge_dimensions(self):
+        """Размеры изображения проверяются по заголовку."""
+        response = self.auth.post(
+            reverse('posts:post_create'),
+            {'text': 'Тестовый пост', 'image': image()},
+        )
+        self.assertFormError(
+            response,
+            'form',
+            'image',
+            'Изображение больше 0 пикселей.',
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(IMAGE_MAX_RESOLUTION=8)
+    def test_normalize_image(self):
+        """Фото поворачивается по EXIF и уменьшается вне запроса."""
+        photo = BytesIO()
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = 6
+        Image.new('RGB', (20, 10)).save(photo, 'JPEG', exif=exif)
+        name = default_storage.save('posts/photo.jpg', photo)
+        normalized = normalize_image(name)
+        self.assertNotEqual(normalized, name)
+        self.assertTrue(normalized.startswith('posts/'))
+        with default_storage.open(normalized) as file:
+            content = file.read()
+            stored = Image.open(BytesIO(content))
+            self.assertEqual(stored.size, (4, 8))
+            self.assertEqual(stored.getexif().get(EXIF_ORIENTATION, 1), 1)
+        digest = os.path.splitext(os.path.basename(normalized))[0]
+        self.assertEqual(digest, hashlib.sha256(content).hexdigest())
+        with default_storage.open(name) as file:
+            self.assertEqual(file.read(), photo.getvalue())
 
     def test_edit_post(self):
         """Валидная форма изменяет запись в Post."""
@@ -0,0 +1,175 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from posts.models import (
+    Comment,
+    Follow,
+    Group,
+    Post,
+    TimelineEntry,
+    User,
+    UserStats,
+)
+
+
+class ImportYatubeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = mixer.blend(User, username='reader')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def write_posts(self, *records):
+        return self.write(
+            'posts.jsonl',
+            '\n'.join(json.dumps(record) for record in records),
+        )
+
+    def test_import_posts(self):
+        """Посты импортируются с авторами, группами и исходной датой."""
+        author = mixer.blend(User, username='author')
+        Follow.objects.create(user=self.reader, author=author)
+        path = self.write_posts(
+            {
+                'id': 10,
+                'author': 'author',
+                'group': 'legacy',
+                'text': 'Старый пост',
+                'created': '2015-03-01T12:00:00+00:00',
+            },
+            {'id': 11, 'author': 'newcomer', 'text': 'Ещё пост'},
+        )
+        call_command('import_yatube', 'posts', path, stdout=StringIO())
+        post = Post.objects.get(legacy_id=10)
+        self.assertEqual(post.author, author)
+        self.assertEqual(post.group, Group.objects.get(slug='legacy'))
+        self.assertEqual(
+            post.created,
+            datetime(2015, 3, 1, 12, tzinfo=timezone.utc),
+        )
+        newcomer = User.objects.get(username='newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(newcomer.stats.posts, 1)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists(),
+        )
+
+    def test_legacy_ids_do_not_collide_with_local_posts(self):
+        """Старые id не затирают локальные посты, комментарии идут к своим."""
+        local = mixer.blend(Post)
+        posts = self.write_posts(
+            {'id': local.pk, 'author': 'reader', 'text': 'Старый пост'},
+        )
+        comments = self.write(
+            'comments.csv',
+            f'id,post,author,text\n1,{local.pk},reader,Отлично\n',
+        )
+        call_command('import_yatube', 'posts', posts, stdout=StringIO())
+        call_command('import_yatube', 'comments', comments, stdout=StringIO())
+        imported = Post.objects.get(legacy_id=local.pk)
+        self.assertNotEqual(imported.pk, local.pk)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.get().post, imported)
+
+    def test_import_comments_and_follows_from_csv(self):
+        """Комментарии и подписки импортируются из CSV."""
+        post = mixer.blend(Post, legacy_id=7)
+        comments = self.write(
+            'comments.csv',
+            'id,post,author,text\n3,7,reader,Отлично\n',
+        )
+        follows = self.write(
+            'follows.csv',
+            f'user,author\nreader,{post.author.username}\n',
+        )
+        call_command('import_yatube', 'comments', comments, stdout=StringIO())
+        call_command('import_yatube', 'follows', follows, stdout=StringIO())
+        self.assertEqual(Comment.objects.get().post, post)
+        self.assertEqual(Comment.objects.get().author, self.reader)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=post.author),
+        )
+        stats = UserStats.objects.get(user=self.reader)
+        self.assertEqual((stats.comments, stats.following), (1, 1))
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists(),
+        )
+
+    def test_comment_ids_do_not_collide_and_repeat(self):
+        """Старые id комментариев не мешают локальным, повтор пропускается."""
+        local = mixer.blend(Comment, post__legacy_id=7)
+        path = self.write(
+            'comments.jsonl',
+            json.dumps(
+                {
+                    'id': local.pk,
+                    'post': 7,
+                    'author': 'reader',
+                    'text': 'Отлично',
+                    'created': '2015-03-01T12:00:00+00:00',
+                },
+            ),
+        )
+        for expected in (1, 0):
+            stdout = StringIO()
+            call_command('import_yatube', 'comments', path, stdout=stdout)
+            self.assertIn(f'Импортировано: {expected} ', stdout.getvalue())
+        imported = Comment.objects.get(legacy_id=local.pk)
+        self.assertNotEqual(imported.pk, local.pk)
+        self.assertEqual(
+            imported.created,
+            datetime(2015, 3, 1, 12, tzinfo=timezone.utc),
+        )
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(UserStats.objects.get(user=self.reader).comments, 1)
+
+    def test_resume_from_checkpoint(self):
+        """После ошибки импорт продолжается с последней удачной пачки."""
+        records = [
+            {'id': number, 'author': 'reader', 'text': f'Пост {number}'}
+            for number in range(1, 6)
+        ]
+        broken = dict(records[2], created='вчера')
+        path = self.write_posts(*records[:2], broken, *records[3:])
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_yatube',
+                'posts',
+                path,
+                batch_size=2,
+                stdout=StringIO(),
+            )
+        self.assertEqual(Post.objects.count(), 2)
+        path = self.write_posts(*records)
+        Post.objects.filter(pk=1).delete()
+        call_command(
+            'import_yatube',
+            'posts',
+            path,
+            batch_size=2,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            list(Post.objects.values_list('legacy_id', flat=True)),
+            [5, 4, 3, 2],
+        )
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
@@ -0,0 +1,154 @@
+import hashlib
+import shutil
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+from PIL import Image
+
+from core.thumbnails import generate_variants
+
+from posts.models import MediaFile, Post, User
+from posts.tests.common import image
+
+
+@override_settings(MEDIA_ROOT=settings.MEDIATESTS)
+class MediaStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIATESTS, ignore_errors=True)
+
+    def test_identical_images_stored_once(self):
+        """Одинаковые файлы хранятся один раз в шардированном каталоге."""
+        first, second = (
+            Post.objects.create(
+                author=self.author,
+                text='Пост',
+                image=image(f'test{number}.gif'),
+            )
+            for number in range(2)
+        )
+        self.assertEqual(first.image.name, second.image.name)
+        directory, shard, subshard, filename = first.image.name.split('/')
+        self.assertEqual(directory, 'posts')
+        self.assertEqual(shard + subshard, filename[:4])
+        self.assertEqual(MediaFile.objects.get().references, 2)
+
+    def test_collect_media_after_last_reference(self):
+        """Файл удаляется только когда на него не ссылается ни один пост."""
+        first, second = mixer.cycle(2).blend(
+            Post,
+            author=self.author,
+            image=image,
+        )
+        name = first.image.name
+        first.delete()
+        call_command('collect_media', grace=0, stdout=StringIO())
+        self.assertTrue(default_storage.exists(name))
+        second.image = ''
+        second.save()
+        self.assertEqual(MediaFile.objects.get(name=name).references, 0)
+        call_command('collect_media', grace=0, stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaFile.objects.filter(name=name).exists())
+
+    @override_settings(IMAGE_MAX_RESOLUTION=8)
+    def test_normalized_image_gets_new_content_name(self):
+        """Нормализованный файл сохраняется под хешем нового содержимого."""
+        photo = BytesIO()
+        Image.new('RGB', (20, 10)).save(photo, 'JPEG')
+        post = Post.objects.create(
+            author=self.author,
+            text='Пост',
+            image=ContentFile(photo.getvalue(), name='photo.jpg'),
+        )
+        original = post.image.name
+        generate_variants(original, normalize=True)
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, original)
+        with default_storage.open(post.image.name) as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        self.assertEqual(post.image.name.split('/')[-1], f'{digest}.jpg')
+        self.assertEqual(post.image.name.split('/')[1], digest[:2])
+        with default_storage.open(original) as file:
+            self.assertEqual(file.read(), photo.getvalue())
+        self.assertEqual(
+            MediaFile.objects.get(name=post.image.name).references,
+            1,
+        )
+        self.assertEqual(MediaFile.objects.get(name=original).references, 0)
+
+
+@override_settings(MEDIA_ROOT=settings.MEDIATESTS)
+class MediaViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.name = default_storage.save('posts/test.gif', image())
+        cls.url = reverse('media', args=(cls.name,))
+        with default_storage.open(cls.name) as file:
+            cls.content = file.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIATESTS, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_serves_file_with_cache_headers(self):
+        """Файл отдаётся целиком с ETag и долгим кешированием."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        not_modified = self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(not_modified.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_serves_byte_range(self):
+        """Запрос Range получает только нужные байты."""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            self.content[2:6],
+        )
+        self.assertEqual(
+            response['Content-Range'],
+            f'bytes 2-5/{len(self.content)}',
+        )
+        response = self.client.get(self.url, HTTP_RANGE='bytes=9999-')
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect')
+    def test_delegates_to_frontend(self):
+        """Передача файла поручается фронтенд-серверу."""
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            settings.MEDIA_ACCEL_PREFIX + self.name,
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_missing_and_outside_files(self):
+        """Отсутствующие файлы и пути вне MEDIA_ROOT дают 404."""
+        for path in ('posts/missing.gif', '../settings.py', 'posts'):
+            with self.subTest(path=path):
+                response = self.client.get(settings.MEDIA_URL + path)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,68 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.utils import encode_cursor
+from posts.models import Comment, Follow, Group, Post, User
+
+FULL_SCAN_RE = re.compile(
+    r'^SCAN (?!subquery\b|CONSTANT ROW)(?!.*\b(USING|VIRTUAL TABLE)\b)',
+)
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author, cls.reader = mixer.cycle(2).blend(User)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(15).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+        )
+        cls.post = cls.posts[0]
+        mixer.cycle(3).blend(Comment, post=cls.post, author=cls.reader)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def plans(self, url: str, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data)
+        with connection.cursor() as cursor:
+            for query in queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                yield query['sql'], [row[-1] for row in cursor.fetchall()]
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент идут по индексам без сортировки во временном дереве."""
+        cursor = {'after': encode_cursor(self.posts[5])}
+        pages = (
+            (reverse('posts:index'), None),
+            (reverse('posts:index'), {'page': 2}),
+            (reverse('posts:index'), cursor),
+            (reverse('posts:group_list', args=(self.group.slug,)), None),
+            (reverse('posts:group_list', args=(self.group.slug,)), cursor),
+            (reverse('posts:profile', args=(self.author.username,)), None),
+            (reverse('posts:profile', args=(self.author.username,)), cursor),
+            (reverse('posts:post_detail', args=(self.post.pk,)), None),
+            (reverse('posts:follow_index'), None),
+            (reverse('posts:follow_index'), cursor),
+        )
+        for url, data in pages:
+            for sql, plan in self.plans(url, data):
+                with self.subTest(url=url, data=data, sql=sql):
+                    for step in plan:
+                        self.assertNotIn(TEMP_SORT, step)
+                        self.assertIsNone(FULL_SCAN_RE.match(step), step)
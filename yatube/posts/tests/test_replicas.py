@@ -0,0 +1,64 @@
+import time
+
+from django.core.cache import cache
+from django.db import router
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.middleware import PRIMARY_PIN_COOKIE
+from posts.models import Post, User
+
+
+@override_settings(DATABASE_REPLICAS=('replica',))
+class ReplicaRoutingTest(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = mixer.blend(User)
+        cls.post = mixer.blend(Post, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_reads_go_to_replica_until_write(self):
+        """GET читает с реплики, после записи сессия читает с основной."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+        response = self.client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Комментарий'},
+        )
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+        cache.clear()
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_writes_and_background_reads_use_primary(self):
+        """Запись и чтение вне запросов к постам идут в основную базу."""
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_lagging_replica_page_not_cached(self):
+        """Страница с отставшей реплики не кешируется и не получает ETag."""
+        anonymous = Client()
+        response = anonymous.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertFalse(response.has_header('ETag'))
+        with override_settings(DATABASE_REPLICAS=()):
+            response = anonymous.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_synced_replica_page_cached(self):
+        """После синхронизации реплики страница снова кешируется."""
+        anonymous = Client()
+        anonymous.get(reverse('posts:index'))
+        cache.set('replica-position:replica', time.time_ns(), None)
+        response = anonymous.get(reverse('posts:index'))
+        self.assertTrue(response.has_header('ETag'))
+        with override_settings(DATABASE_REPLICAS=()):
+            response = anonymous.get(reverse('posts:index'))
+        self.assertIsNone(response.context)
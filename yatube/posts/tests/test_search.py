@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Group, Post, User
+from posts.search import search_posts
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author, cls.other = mixer.cycle(2).blend(User)
+        cls.group = mixer.blend(Group)
+
+    def test_search_highlights_and_escapes(self):
+        """Найденные слова подсвечиваются, разметка экранируется."""
+        Post.objects.create(
+            author=self.author,
+            text='<b>Котики</b> и собаки',
+        )
+        Post.objects.create(author=self.author, text='Только собаки')
+        response = self.client.get(reverse('posts:search'), {'q': 'котик'})
+        self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertContains(response, '&lt;b&gt;<mark>Котики</mark>')
+
+    def test_search_filters_and_keyset_pages(self):
+        """Фильтры по группе и автору, постраничный вывод по курсору."""
+        for number in range(3):
+            Post.objects.create(
+                author=self.author,
+                group=self.group,
+                text=f'Пост про море {number}',
+            )
+        Post.objects.create(author=self.other, text='Тоже про море')
+        first = search_posts('море', group_id=self.group.pk, quantity=2)
+        self.assertTrue(first.has_next())
+        second = search_posts(
+            'море',
+            group_id=self.group.pk,
+            after=first.next_cursor,
+            quantity=2,
+        )
+        self.assertFalse(second.has_next())
+        found = [post.pk for post in (*first, *second)]
+        self.assertEqual(len(set(found)), 3)
+        other = search_posts('море', author_id=self.other.pk)
+        self.assertEqual([post.author for post in other], [self.other])
+
+    def test_index_follows_edits_and_rebuild(self):
+        """Индекс следует за изменениями и перестраивается командой."""
+        post = Post.objects.create(author=self.author, text='Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertFalse(search_posts('старый'))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')",
+            )
+        self.assertFalse(search_posts('новый'))
+        call_command('rebuild_search', stdout=StringIO())
+        self.assertEqual(list(search_posts('новый')), [post])
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from posts.models import Comment, Follow, Post, User, UserStats
+
+
+class UserStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author, cls.reader = mixer.cycle(2).blend(User)
+
+    def test_counters_follow_signals(self):
+        """Счётчики меняются при создании и удалении объектов."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        author = UserStats.objects.get(user=self.author)
+        reader = UserStats.objects.get(user=self.reader)
+        self.assertEqual((author.posts, author.followers), (1, 1))
+        self.assertEqual((reader.comments, reader.following), (1, 1))
+        follow.delete()
+        post.delete()
+        author.refresh_from_db()
+        reader.refresh_from_db()
+        self.assertEqual((author.posts, author.followers), (0, 0))
+        self.assertEqual((reader.comments, reader.following), (0, 0))
+
+    def test_recount_stats_repairs_drift(self):
+        """Команда recount_stats исправляет расхождения."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        )
+        UserStats.objects.all().delete()
+        call_command('recount_stats', batch_size=1, stdout=StringIO())
+        self.assertEqual(UserStats.objects.get(user=self.author).posts, 3)
+        self.assertEqual(UserStats.objects.get(user=self.reader).posts, 0)
+
+    def test_decrement_never_goes_below_zero(self):
+        """Уменьшение счётчика без строки статистики не ломает удаление."""
+        Post.objects.bulk_create([Post(author=self.author, text='Пост')])
+        UserStats.objects.filter(user=self.author).delete()
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.get(author=self.author).delete()
+        self.assertEqual(UserStats.objects.get(user=self.author).posts, 0)
@@ -1,13 +1,19 @@
+import shutil
+import tempfile
 from http import HTTPStatus
 
 from django.contrib.auth.views import redirect_to_login
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from mixer.backend.django import mixer
 
 from posts.models import Group, Post, User
 
+MEDIA_ROOT = tempfile.mkdtemp()
 
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class PostsURLTests(TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -48,6 +54,14 @@ class PostsURLTests(TestCase):
             ),
         }
 
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_http_statuses(self) -> None:
         httpstatuses = (
             (self.urls.get('add_comment'), HTTPStatus.FOUND, Client()),
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase
+
+from core.utils import PAGE_RANGE_ELLIPSIS, elided_page_range
+
+
+class ElidedPageRangeTest(TestCase):
+    def test_short_range_is_not_elided(self):
+        """Короткий список страниц выводится целиком."""
+        paginator = Paginator(range(50), 10)
+        self.assertEqual(
+            list(elided_page_range(paginator, 3)),
+            [1, 2, 3, 4, 5],
+        )
+
+    def test_long_range_is_windowed(self):
+        """Длинный список страниц сворачивается вокруг текущей."""
+        paginator = Paginator(range(50_000), 10)
+        windows = (
+            (1, [1, 2, 3, PAGE_RANGE_ELLIPSIS, 5000]),
+            (4, [1, 2, 3, 4, 5, 6, PAGE_RANGE_ELLIPSIS, 5000]),
+            (
+                2500,
+                [
+                    1,
+                    PAGE_RANGE_ELLIPSIS,
+                    2498,
+                    2499,
+                    2500,
+                    2501,
+                    2502,
+                    PAGE_RANGE_ELLIPSIS,
+                    5000,
+                ],
+            ),
+            (5000, [1, PAGE_RANGE_ELLIPSIS, 4998, 4999, 5000]),
+        )
+        for number, expected in windows:
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(elided_page_range(paginator, number)),
+                    expected,
+                )
+
+
+class SqlitePragmasTest(TestCase):
+    def test_connection_is_tuned(self):
+        """Соединение с SQLite получает PRAGMA из настроек."""
+        with connection.cursor() as cursor:
+            for name in ('synchronous', 'temp_store', 'busy_timeout'):
+                with self.subTest(name=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(
+                        cursor.fetchone()[0],
+                        {'synchronous': 1, 'temp_store': 2}.get(
+                            name,
+                            settings.SQLITE_PRAGMAS[name],
+                        ),
+                    )
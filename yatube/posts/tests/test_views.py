@@ -1,13 +1,26 @@
 import shutil
+from http import HTTPStatus
 
 from django import forms
 from django.conf import settings
 from django.core.cache import cache
-from django.test import Client, TestCase, override_settings
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from mixer.backend.django import mixer
 
-from posts.models import Follow, Group, Post, User
+from core.thumbnails import generate_variants, prefetch_variants
+from core.utils import encode_cursor, paginate
+from posts.models import (
+    Comment,
+    Follow,
+    Group,
+    Post,
+    TimelineEntry,
+    User,
+    UserStats,
+)
 from posts.tests.common import image
 
 
@@ -115,6 +128,56 @@ class PostsPagesTests(TestCase):
                 response = self.auth.get(adress + '?page=2')
                 self.assertEqual(len(response.context['page_obj']), 6)
 
+    def test_cursor_paginator_walks_feed_both_ways(self):
+        """Курсорная пагинация проходит ленту вперёд и назад."""
+        self.addCleanup(cache.clear)
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Текст поста {post_number}')
+            for post_number in range(15)
+        )
+        expected = list(Post.objects.order_by('-created', '-pk'))
+        first = paginate(RequestFactory().get('/'), Post.objects.all())
+        token = encode_cursor(expected[9])
+        for adress in self.paginated:
+            with self.subTest(adress=adress):
+                response = self.auth.get(adress, {'after': token})
+                self.assertTrue(response.context['page_obj'].is_cursor)
+        response = self.auth.get(reverse('posts:index'), {'after': token})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), expected[10:])
+        self.assertTrue(page_obj.has_previous())
+        self.assertFalse(page_obj.has_next())
+        response = self.auth.get(
+            reverse('posts:index'),
+            {'before': page_obj.previous_cursor},
+        )
+        self.assertEqual(list(response.context['page_obj']), expected[:10])
+        self.assertEqual(list(first), expected[:10])
+
+    def test_cursor_paginator_ignores_broken_token(self):
+        self.addCleanup(cache.clear)
+        response = self.auth.get(reverse('posts:index'), {'after': '!!!'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), [self.post])
+        self.assertFalse(page_obj.has_previous())
+
+    @override_settings(PAGE_EXACT_COUNT_LIMIT=3)
+    def test_paginator_count_cached_until_posts_change(self):
+        """Большие счётчики кэшируются и сбрасываются при новых постах."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Текст поста {post_number}')
+            for post_number in range(4)
+        )
+        adress = reverse('posts:profile', args={self.author})
+        response = self.auth.get(adress)
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        Post.objects.bulk_create([Post(author=self.author, text='Тихий')])
+        response = self.auth.get(adress)
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        Post.objects.create(author=self.author, text='С сигналом')
+        response = self.auth.get(adress)
+        self.assertEqual(response.context['page_obj'].paginator.count, 7)
+
     def test_post_detail_uses_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
         response = self.auth.get(
@@ -129,6 +192,50 @@ class PostsPagesTests(TestCase):
         self.assertEqual(response.context.get('post').group, self.post.group)
         self.assertEqual(response.context.get('post').image, self.post.image)
 
+    @override_settings(COMMENTS_PAGE_SIZE=10)
+    def test_post_detail_comments_paginated_without_n_plus_one(self):
+        """Комментарии грузятся порциями, число запросов не растёт."""
+        detail = reverse('posts:post_detail', args={self.post.id})
+        Comment.objects.create(post=self.post, author=self.anon, text='Ок')
+        self.auth.get(detail)
+        with CaptureQueriesContext(connection) as single:
+            self.auth.get(detail)
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=mixer.blend(User), text='Ок')
+            for _ in range(14)
+        )
+        with CaptureQueriesContext(connection) as many:
+            response = self.auth.get(detail)
+        self.assertEqual(len(single), len(many))
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 10)
+        response = self.auth.get(detail, {'after': comments.next_cursor})
+        self.assertEqual(len(response.context['comments']), 5)
+        self.assertFalse(response.context['comments'].has_next())
+
+    def test_page_variants_resolved_in_one_lookup(self):
+        """Миниатюры страницы запрашиваются из хранилища одним запросом."""
+        posts = [
+            Post.objects.create(
+                author=self.author,
+                text='Пост',
+                image=image(color=(number, 0, 0)),
+            )
+            for number in range(3)
+        ]
+        generate_variants(posts[0].image.name)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            prefetch_variants(posts, 'card', 'detail')
+        self.assertEqual(
+            sum('thumbnail_kvstore' in query['sql'] for query in queries),
+            1,
+        )
+        self.assertTrue(
+            posts[0].variants['card'].src.name.startswith('cache/'),
+        )
+        self.assertEqual(posts[1].variants['card'].src, posts[1].image)
+
     def test_post_create_uses_correct_context(self):
         """Шаблон post_create сформирован с правильным контекстом."""
         response = self.auth.get(
@@ -162,20 +269,79 @@ class PostsPagesTests(TestCase):
                 form_field = response.context.get('form').fields.get(value)
                 self.assertIsInstance(form_field, expected)
 
-    def test_index_cached(self):
-        """Главная страница кэшируется"""
-        response = self.auth.get(reverse('posts:index'))
-        post = Post.objects.create(
-            text='Проверяем кэширование страницы',
-            author=self.author,
+    def test_feeds_cached_until_generation_changes(self):
+        """Ленты кэшируются до изменения постов и групп."""
+        for number, adress in enumerate(self.paginated):
+            with self.subTest(adress=adress):
+                self.auth.get(adress)
+                Post.objects.filter(pk=self.post.pk).update(text='Скрытый')
+                response = self.auth.get(adress)
+                self.assertNotContains(response, 'Скрытый')
+                self.post.save()
+                response = self.auth.get(adress)
+                self.assertContains(response, self.post.text)
+                self.group.title = f'Новая {number}'
+                self.group.save()
+                response = self.auth.get(adress)
+                self.assertContains(response, self.group.title)
+
+    def test_feed_cache_keyed_by_page(self):
+        """Кэш ленты не отдаёт первую страницу вместо второй."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {post_number}')
+            for post_number in range(10)
         )
-        cached = self.auth.get(reverse('posts:index'))
-        post.delete()
-        response = self.auth.get(reverse('posts:index'))
-        self.assertEqual(cached.content, response.content)
         cache.clear()
-        response = self.auth.get(reverse('posts:index'))
-        self.assertNotEqual(cached.content, response.content)
+        first = self.auth.get(reverse('posts:index'))
+        second = self.auth.get(reverse('posts:index'), {'page': 2})
+        self.assertNotEqual(
+            first.content.count(b'card-img'),
+            second.content.count(b'card-img'),
+        )
+        self.assertContains(second, self.post.text)
+
+    def test_anonymous_pages_purged_by_surrogate_keys(self):
+        """Страницы для анонимов кэшируются и сбрасываются по тегам."""
+        detail = reverse('posts:post_detail', args={self.post.id})
+        profile = reverse('posts:profile', args={self.anon})
+        anon = Client()
+        for adress in (*self.paginated, detail, profile):
+            anon.get(adress)
+        Post.objects.filter(pk=self.post.pk).update(text='Скрытый')
+        response = anon.get(detail)
+        self.assertIsNone(response.context)
+        self.assertNotContains(response, 'Скрытый')
+        Comment.objects.create(post=self.post, author=self.anon, text='Ок')
+        self.assertContains(anon.get(detail), 'Скрытый')
+        for adress in self.paginated:
+            with self.subTest(adress=adress):
+                self.assertIsNone(anon.get(adress).context)
+        self.assertIsNone(anon.get(profile).context)
+        Follow.objects.create(user=mixer.blend(User), author=self.author)
+        self.assertIsNone(anon.get(profile).context)
+        Follow.objects.create(user=mixer.blend(User), author=self.anon)
+        self.assertIsNotNone(anon.get(profile).context)
+
+    def test_conditional_get_returns_not_modified(self):
+        """Повторный запрос с ETag получает 304 до изменения данных."""
+        detail = reverse('posts:post_detail', args={self.post.id})
+        pages = (
+            *self.paginated,
+            detail,
+            reverse('posts:follow_index'),
+        )
+        for adress in pages:
+            with self.subTest(adress=adress):
+                etag = self.auth.get(adress)['ETag']
+                response = self.auth.get(adress, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertIsNone(response.context)
+        etag = Client().get(detail)['ETag']
+        response = Client().get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(post=self.post, author=self.anon, text='Ок')
+        response = Client().get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
 
     def test_auth_follow_and_unfollow(self):
         self.auth2.get(
@@ -203,3 +369,69 @@ class PostsPagesTests(TestCase):
         self.assertIn(post, response.context['page_obj'].object_list)
         response = self.auth2.get(reverse('posts:follow_index'))
         self.assertNotIn(post, response.context['page_obj'].object_list)
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_follow_timeline_is_capped(self):
+        """Лента подписок хранит не больше TIMELINE_SIZE записей."""
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=self.anon)
+            for number in range(3)
+        ]
+        self.assertEqual(
+            set(
+                TimelineEntry.objects.filter(user=self.author).values_list(
+                    'post',
+                    flat=True,
+                ),
+            ),
+            {posts[1].pk, posts[2].pk},
+        )
+        Follow.objects.filter(user=self.author).delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.author))
+        Follow.objects.create(user=self.author, author=self.anon)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.author).count(),
+            2,
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_follow_feed_merges_popular_authors_on_read(self):
+        """Посты популярных авторов попадают в ленту при чтении."""
+        post = Post.objects.create(text='Тестовый пост', author=self.anon)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        response = self.auth.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'].object_list)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_follow_feed_uses_counters_for_fan_out(self):
+        """Запись и чтение ленты опираются на одни и те же счётчики."""
+        UserStats.objects.filter(user=self.anon).update(followers=0)
+        post = Post.objects.create(text='Тестовый пост', author=self.anon)
+        response = self.auth.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'].object_list)
+
+    def test_cached_pages_pick_up_generated_variants(self):
+        """После создания миниатюр кеш страниц с картинкой обновляется."""
+        url = reverse('posts:profile', args=(self.author.username,))
+        clients = (self.auth, Client())
+        for client in clients:
+            self.assertNotContains(client.get(url), '/media/cache/')
+        generate_variants(self.post.image.name)
+        for client in clients:
+            with self.subTest(client=client):
+                self.assertContains(client.get(url), '/media/cache/')
+
+    def test_moving_post_refreshes_previous_group(self):
+        """Перенос поста в другую группу обновляет кеш старой группы."""
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        anonymous = Client()
+        anonymous.get(url)
+        etag = self.auth.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = mixer.blend(Group)
+        post.save()
+        response = self.auth.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+        self.assertNotContains(response, self.post.text)
+        self.assertNotContains(anonymous.get(url), self.post.text)
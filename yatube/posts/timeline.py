@@ -0,0 +1,116 @@
+from collections import defaultdict
+from typing import Iterable, List, Set
+
+from django.conf import settings
+from django.db.models import Count, F, Q, QuerySet
+
+from posts.models import Follow, Post, TimelineEntry, User, UserStats
+
+
+def fanout_skipped(author_ids: Iterable[int]) -> Set[int]:
+    return set(
+        UserStats.objects.filter(
+            user_id__in=author_ids,
+            followers__gt=settings.TIMELINE_FANOUT_LIMIT,
+        ).values_list('user_id', flat=True),
+    )
+
+
+def trim(user_ids: Iterable[int]) -> None:
+    overflowing = (
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=settings.TIMELINE_SIZE)
+        .values_list('user_id', flat=True)
+    )
+    for user_id in overflowing:
+        stale = TimelineEntry.objects.filter(user_id=user_id).order_by(
+            '-created',
+        )[settings.TIMELINE_SIZE:]
+        TimelineEntry.objects.filter(
+            pk__in=list(stale.values_list('pk', flat=True)),
+        ).delete()
+
+
+def fan_out(post: Post) -> None:
+    if fanout_skipped((post.author_id,)):
+        return
+    follower_ids = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id',
+            flat=True,
+        ),
+    )
+    TimelineEntry.objects.bulk_create(
+        TimelineEntry(user_id=user_id, post=post, created=post.created)
+        for user_id in follower_ids
+    )
+    trim(follower_ids)
+
+
+def fan_out_batch(posts: List[Post]) -> None:
+    author_ids = {post.author_id for post in posts}
+    followers = defaultdict(list)
+    for author_id, user_id in Follow.objects.filter(
+        author_id__in=author_ids - fanout_skipped(author_ids),
+    ).values_list('author_id', 'user_id'):
+        followers[author_id].append(user_id)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, created=post.created)
+            for post in posts
+            for user_id in followers[post.author_id]
+        ),
+        ignore_conflicts=True,
+    )
+    trim({user_id for user_ids in followers.values() for user_id in user_ids})
+
+
+def backfill(follow: Follow) -> None:
+    backfill_batch([follow])
+
+
+def backfill_batch(follows: List[Follow]) -> None:
+    author_ids = {follow.author_id for follow in follows}
+    recent = {
+        author_id: list(
+            Post.objects.visible()
+            .filter(author_id=author_id)
+            .order_by('-created')
+            .values_list('pk', 'created')[: settings.TIMELINE_SIZE],
+        )
+        for author_id in author_ids - fanout_skipped(author_ids)
+    }
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=follow.user_id, post_id=pk, created=created)
+            for follow in follows
+            for pk, created in recent.get(follow.author_id, ())
+        ),
+        ignore_conflicts=True,
+    )
+    trim({follow.user_id for follow in follows})
+
+
+def unfollow(follow: Follow) -> None:
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id,
+    ).delete()
+
+
+def timeline(user: User) -> QuerySet:
+    skipped = fanout_skipped(
+        user.follower.values_list('author_id', flat=True),
+    )
+    if not skipped:
+        # Записи ленты скрытых постов удаляются сразу при пометке.
+        return Post.objects.filter(timeline__user=user).order_by(
+            F('timeline__created').desc(),
+            F('timeline__post').desc(),
+        )
+    return Post.objects.visible().filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post_id'))
+        | Q(author_id__in=skipped),
+    )
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from posts import views
+from posts import api, views
 from posts.apps import PostsConfig
 
 app_name = PostsConfig.name
@@ -10,10 +10,31 @@ urlpatterns = [
     path('create/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/export.<str:file_format>',
+        views.group_export,
+        name='group_export',
+    ),
     path('posts/<int:id>/', views.post_detail, name='post_detail'),
     path('posts/<int:id>/comment/', views.add_comment, name='add_comment'),
     path('posts/<int:id>/edit/', views.post_edit, name='post_edit'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
+    path(
+        'profile/<str:username>/export.<str:file_format>',
+        views.profile_export,
+        name='profile_export',
+    ),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/posts/batch/', api.post_batch, name='api_post_batch'),
+    path('api/posts/<int:id>/', api.post_detail, name='api_post_detail'),
+    path('api/follow/', api.follow_index, name='api_follow_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path(
+        'api/profile/<str:username>/',
+        api.profile,
+        name='api_profile',
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
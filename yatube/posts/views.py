@@ -1,54 +1,142 @@
+from typing import Optional
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.db.models import QuerySet
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition
 
-from core.utils import paginate
+from core.utils import (
+    CURSOR_AFTER,
+    cursor_paginate,
+    feed_cache,
+    generation_etag,
+    paginate,
+    tag_response,
+)
+from posts.export import CONTENT_TYPES, export_lines
 from posts.forms import CommentForm, PostForm
-from posts.models import Follow, Group, Post, User
+from posts.models import Follow, Group, Post, UserStats, visible_users
+from posts.search import search_posts
+from posts.timeline import timeline
+
+
+def index_etag(request: HttpRequest) -> Optional[str]:
+    return generation_etag(request, ('posts', 'groups'))
+
+
+def group_etag(request: HttpRequest, slug: str) -> Optional[str]:
+    pk = (
+        Group.objects.filter(slug=slug, pending_deletion=False)
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if pk is None:
+        return None
+    return generation_etag(request, (f'group:{pk}',))
+
+
+def profile_etag(request: HttpRequest, username: str) -> Optional[str]:
+    pk = (
+        visible_users()
+        .filter(username=username)
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if pk is None:
+        return None
+    return generation_etag(
+        request,
+        (f'author:{pk}', 'groups', f'followers:{pk}', f'follow:{pk}'),
+    )
+
+
+def post_etag(request: HttpRequest, id: int) -> Optional[str]:
+    return generation_etag(request, (f'post:{id}', 'groups'))
 
 
+def follow_etag(request: HttpRequest) -> Optional[str]:
+    return generation_etag(
+        request,
+        (
+            'groups',
+            *(
+                f'author:{author_id}'
+                for author_id in request.user.follower.values_list(
+                    'author_id',
+                    flat=True,
+                )
+            ),
+        ),
+    )
+
+
+@condition(etag_func=index_etag)
 def index(request: HttpRequest) -> HttpResponse:
-    return render(
+    tags = ('posts', 'groups')
+    response = render(
         request,
         'posts/index.html',
         {
             'page_obj': paginate(
                 request,
-                Post.objects.select_related('author', 'group'),
+                Post.objects.visible().select_related('author', 'group'),
+                count_tags=('posts',),
             ),
+            'feed_cache': feed_cache(request, tags),
         },
     )
+    return tag_response(response, tags)
 
 
+@condition(etag_func=group_etag)
 def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
-    group = get_object_or_404(Group, slug=slug)
-    return render(
+    group = get_object_or_404(Group, slug=slug, pending_deletion=False)
+    tags = (f'group:{group.pk}',)
+    response = render(
         request,
         'posts/group_list.html',
         {
             'group': group,
             'page_obj': paginate(
                 request,
-                group.posts.select_related(
+                group.posts.visible().select_related(
                     'author',
                     'group',
                 ),
+                count_tags=(f'group:{group.pk}',),
             ),
+            'feed_cache': feed_cache(request, tags),
         },
     )
+    return tag_response(response, tags)
 
 
+@condition(etag_func=profile_etag)
 def profile(request: HttpRequest, username: str) -> HttpResponse:
-    author = get_object_or_404(User, username=username)
-    return render(
+    author = get_object_or_404(
+        visible_users().select_related('stats'),
+        username=username,
+    )
+    tags = (f'author:{author.pk}', 'groups')
+    response = render(
         request,
         'posts/profile.html',
         {
             'author': author,
+            'stats': getattr(author, 'stats', None) or UserStats(user=author),
             'page_obj': paginate(
                 request,
-                author.posts.select_related('author', 'group'),
+                author.posts.visible().select_related('author', 'group'),
+                count_tags=(f'author:{author.pk}',),
             ),
+            'feed_cache': feed_cache(request, tags),
             'following': (
                 request.user.is_authenticated
                 and Follow.objects.filter(
@@ -58,17 +146,110 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
             ),
         },
     )
+    return tag_response(
+        response,
+        (*tags, f'followers:{author.pk}', f'follow:{author.pk}'),
+    )
 
 
+@condition(etag_func=post_etag)
 def post_detail(request: HttpRequest, id: int) -> HttpResponse:
-    return render(
+    post = get_object_or_404(
+        Post.objects.visible().select_related('author', 'group'),
+        pk=id,
+    )
+    response = render(
         request,
         'posts/post_detail.html',
         {
-            'post': get_object_or_404(Post, pk=id),
+            'post': post,
+            'comments': cursor_paginate(
+                post.comments.visible().select_related('author'),
+                settings.COMMENTS_PAGE_SIZE,
+                after=request.GET.get(CURSOR_AFTER),
+            ),
             'form': CommentForm(),
         },
     )
+    return tag_response(response, (f'post:{post.pk}', 'groups'))
+
+
+def search(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get('q', '').strip()
+    group = (
+        get_object_or_404(
+            Group,
+            slug=request.GET['group'],
+            pending_deletion=False,
+        )
+        if request.GET.get('group')
+        else None
+    )
+    author = (
+        get_object_or_404(
+            visible_users(),
+            username=request.GET['author'],
+        )
+        if request.GET.get('author')
+        else None
+    )
+    params = request.GET.copy()
+    params.pop(CURSOR_AFTER, None)
+    return render(
+        request,
+        'posts/search.html',
+        {
+            'query': query,
+            'group': group,
+            'author': author,
+            'page_obj': search_posts(
+                query,
+                group_id=group and group.pk,
+                author_id=author and author.pk,
+                after=request.GET.get(CURSOR_AFTER),
+            ),
+            'query_string': params.urlencode(),
+        },
+    )
+
+
+def export_response(
+    queryset: QuerySet,
+    name: str,
+    file_format: str,
+) -> StreamingHttpResponse:
+    if file_format not in CONTENT_TYPES:
+        raise Http404(f'Неизвестный формат выгрузки: {file_format}')
+    response = StreamingHttpResponse(
+        export_lines(queryset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{file_format}"'
+    )
+    return response
+
+
+def profile_export(
+    request: HttpRequest,
+    username: str,
+    file_format: str,
+) -> StreamingHttpResponse:
+    author = get_object_or_404(visible_users(), username=username)
+    return export_response(
+        author.posts.visible(),
+        author.username,
+        file_format,
+    )
+
+
+def group_export(
+    request: HttpRequest,
+    slug: str,
+    file_format: str,
+) -> StreamingHttpResponse:
+    group = get_object_or_404(Group, slug=slug, pending_deletion=False)
+    return export_response(group.posts.visible(), group.slug, file_format)
 
 
 @login_required
@@ -86,7 +267,7 @@ def post_create(request: HttpRequest) -> HttpResponse:
 
 @login_required
 def post_edit(request: HttpRequest, id: int) -> HttpResponse:
-    post = get_object_or_404(Post, pk=id)
+    post = get_object_or_404(Post.objects.visible(), pk=id)
     if post.author != request.user:
         return redirect('posts:post_detail', post.pk)
 
@@ -118,12 +299,13 @@ def add_comment(request: HttpRequest, id: int) -> HttpResponse:
     form = CommentForm(request.POST or None)
     if form.is_valid():
         form.instance.author = request.user
-        form.instance.post = get_object_or_404(Post, id=id)
+        form.instance.post = get_object_or_404(Post.objects.visible(), id=id)
         form.save()
     return redirect('posts:post_detail', id=id)
 
 
 @login_required
+@condition(etag_func=follow_etag)
 def follow_index(request: HttpRequest) -> HttpResponse:
     return render(
         request,
@@ -131,7 +313,17 @@ def follow_index(request: HttpRequest) -> HttpResponse:
         {
             'page_obj': paginate(
                 request,
-                Post.objects.filter(author__following__user=request.user),
+                timeline(request.user).select_related('author', 'group'),
+                count_tags=(
+                    f'follow:{request.user.pk}',
+                    *(
+                        f'author:{author_id}'
+                        for author_id in request.user.follower.values_list(
+                            'author_id',
+                            flat=True,
+                        )
+                    ),
+                ),
             ),
         },
     )
@@ -139,7 +331,7 @@ def follow_index(request: HttpRequest) -> HttpResponse:
 
 @login_required
 def profile_follow(request: HttpRequest, username: str) -> HttpResponse:
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(visible_users(), username=username)
     if author != request.user:
         Follow.objects.get_or_create(
             user=request.user,
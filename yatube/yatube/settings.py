@@ -34,8 +34,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaReadMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -65,9 +67,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+        },
     },
 }
 
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+}
+
+DATABASE_REPLICAS = ()
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_APPS = ('posts',)
+
+REPLICA_PIN_SECONDS = 10
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+    'busy_timeout': 20 * 1000,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,6 +125,39 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 PAGE_SIZE = 10
 
+COMMENTS_PAGE_SIZE = 50
+
+PAGE_COUNTER = 'core.utils.cached_count'
+
+PAGE_EXACT_COUNT_LIMIT = 1000
+
+PAGE_COUNT_TIMEOUT = 60 * 15
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+THUMBNAIL_VARIANTS = {
+    'card': {
+        'geometry': '960x339',
+        'options': {'crop': 'center', 'upscale': True},
+        'sizes': '(min-width: 768px) 41vw, 100vw',
+    },
+    'detail': {
+        'geometry': '960x339',
+        'options': {'upscale': True},
+        'sizes': '(min-width: 768px) 41vw, 100vw',
+    },
+}
+
+THUMBNAIL_WIDTHS = (480, 960)
+
+THUMBNAIL_FORMATS = ('WEBP', 'JPEG')
+
+TIMELINE_SIZE = 800
+
+TIMELINE_FANOUT_LIMIT = 5000
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -113,6 +174,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 MEDIATESTS = os.path.join(BASE_DIR, 'mediatests')
 
+MEDIA_ACCEL = None
+
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+MEDIA_COLLECT_GRACE = 60 * 60 * 24
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -120,3 +193,34 @@ CACHES = {
 }
 
 MAX_DEFAULT_LENGTH = 15
+
+BACKGROUND_WORKERS = 2
+
+FILE_UPLOAD_HANDLERS = ['core.uploads.BoundedUploadHandler']
+
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+
+IMAGE_MAX_PIXELS = 50_000_000
+
+IMAGE_FORMATS = ('GIF', 'JPEG', 'PNG', 'WEBP')
+
+IMAGE_MAX_RESOLUTION = 2560
+
+IMAGE_SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+SEARCH_MAX_TERMS = 10
+
+SEARCH_SNIPPET_TOKENS = 32
+
+ADMIN_EXCERPT_LENGTH = 80
+
+EXPORT_CHUNK_SIZE = 2000
+
+DELETION_BATCH_SIZE = 500
+
+API_MAX_PAGE_SIZE = 100
+
+API_BATCH_MAX_IDS = 100
@@ -1,10 +1,10 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.apps import AuthConfig
 from django.urls import include, path
 
 from about.apps import AboutConfig
+from core.views import serve_media
 from posts.apps import PostsConfig
 
 handler404 = 'core.views.page_not_found'
@@ -17,10 +17,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace=AuthConfig.name)),
     path('auth/', include('django.contrib.auth.urls')),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        serve_media,
+        name='media',
+    ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT,
-    )